@@ -62,6 +62,10 @@ class Settings(BaseSettings):
     
     # CPSC API
     CPSC_API_BASE_URL: str = "https://www.saferproducts.gov/RestWebServices"
+    CPSC_STRICT_PARSE: bool = False  # Validate parsed CPSC records with Pydantic (debugging)
+    
+    # Query cache (optional; leave empty to disable)
+    REDIS_URL: str = ""
     
     # External API Keys (loaded from .env)
     GOOGLE_VISION_API_KEY: str = ""
@@ -438,6 +438,9 @@ def organization_to_db(organization: Organization) -> OrganizationDB:
         api_key=organization.api_key,
         api_headers=organization.api_headers,
         api_enabled=organization.api_enabled,
+        api_max_concurrency=getattr(organization, 'api_max_concurrency', None),
+        api_rate_per_min=getattr(organization, 'api_rate_per_min', None),
+        api_http2_enabled=getattr(organization, 'api_http2_enabled', False),
         api_import_schedule=organization.api_import_schedule,
         api_import_enabled=getattr(organization, 'api_import_enabled', False),
         api_import_last_run=getattr(organization, 'api_import_last_run', None),
@@ -465,7 +468,8 @@ def organization_to_db(organization: Organization) -> OrganizationDB:
 
 def db_to_organization(db_org: OrganizationDB) -> Organization:
     """Convert OrganizationDB to Organization."""
-    return Organization(
+    # Rows were validated on write; model_construct skips a second pass on read
+    return Organization.model_construct(
         organization_id=db_org.organization_id,
         organization_type=db_org.organization_type,
         name=db_org.name,
@@ -497,6 +501,9 @@ def db_to_organization(db_org: OrganizationDB) -> Organization:
         api_import_field_mapping=getattr(db_org, 'api_import_field_mapping', None),
         api_headers=db_org.api_headers or {},
         api_enabled=db_org.api_enabled,
+        api_max_concurrency=getattr(db_org, 'api_max_concurrency', None),
+        api_rate_per_min=getattr(db_org, 'api_rate_per_min', None),
+        api_http2_enabled=getattr(db_org, 'api_http2_enabled', None) or False,
         file_upload_method=db_org.file_upload_method,
         blob_storage_provider=db_org.blob_storage_provider,
         blob_storage_container=db_org.blob_storage_container,
@@ -520,7 +527,8 @@ def db_to_organization(db_org: OrganizationDB) -> Organization:
 
 def db_to_import_history(db_history: ImportHistoryDB) -> ImportHistory:
     """Convert ImportHistoryDB to ImportHistory."""
-    return ImportHistory(
+    # Rows were validated on write; model_construct skips a second pass on read
+    return ImportHistory.model_construct(
         import_id=db_history.import_id,
         import_type=db_history.import_type,
         source=db_history.source,
@@ -2,7 +2,7 @@
 SQLAlchemy ORM models for database persistence.
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, JSON, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 # Use standard JSON type which works for both SQLite and PostgreSQL
 # SQLAlchemy will automatically use the correct dialect-specific implementation
@@ -55,7 +55,7 @@ class ProductBanDB(Base):
     ban_type = Column(SQLEnum(BanType), default=BanType.RECALL, index=True)
     
     # Location
-    country = Column(String, nullable=True)
+    country = Column(String, nullable=True, index=True)
     region = Column(String, nullable=True)
     
     # Classification
@@ -84,6 +84,11 @@ class ProductBanDB(Base):
     remedies = relationship("ProductBanRemedyDB", back_populates="product_ban", cascade="all, delete-orphan")
     images = relationship("ProductBanImageDB", back_populates="product_ban", cascade="all, delete-orphan")
     listings = relationship("MarketplaceListingDB", back_populates="product_ban")
+    
+    # Risk-filtered listings, newest first
+    __table_args__ = (
+        Index("ix_product_bans_risk_level_created_at", "risk_level", created_at.desc()),
+    )
 
 
 class ProductBanProductDB(Base):
@@ -293,8 +298,9 @@ class InvestigationListingDB(Base):
     investigation = relationship("InvestigationDB", back_populates="listing_links")
     listing = relationship("MarketplaceListingDB", back_populates="investigation_links")
     
-    # Unique constraint
+    # One link per (investigation, listing); the unique index is what link upserts conflict on
     __table_args__ = (
+        Index("uq_investigation_listings_investigation_listing", "investigation_id", "listing_id", unique=True),
         {"sqlite_autoincrement": True},
     )
 
@@ -325,6 +331,11 @@ class ImportHistoryDB(Base):
     
     error_summary = Column(Text, nullable=True)
     meta_data = Column(SQLiteJSON, default=dict)  # Renamed from 'metadata' to avoid SQLAlchemy reserved name
+    
+    __table_args__ = (
+        # Filtered history listing: WHERE source/import_type ORDER BY created_at DESC LIMIT n
+        Index("ix_import_history_source_type_created_at", "source", "import_type", created_at.desc()),
+    )
 
 
 # Agent Configuration (simplified - store as JSON)
@@ -414,6 +425,9 @@ class OrganizationDB(Base):
     api_key = Column(String, nullable=True)  # Encrypted
     api_headers = Column(SQLiteJSON, default=dict)
     api_enabled = Column(Boolean, default=False)
+    api_max_concurrency = Column(Integer, nullable=True)  # Per-host concurrent request limit
+    api_rate_per_min = Column(Integer, nullable=True)  # Outbound request budget per minute
+    api_http2_enabled = Column(Boolean, default=False)
     
     # API import schedule configuration
     api_import_schedule = Column(String, nullable=True)  # 'daily', 'weekly', 'monthly', 'none'
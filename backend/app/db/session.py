@@ -2,12 +2,16 @@
 Database session management for SQLAlchemy.
 """
 
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
 import logging
 import os
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 # Create async engine with larger connection pool for concurrent imports
@@ -31,17 +35,56 @@ elif "postgresql" in database_url:
         # For Unix socket connections, SSL not needed
         connect_args = {}
 
+def _json_serializer(value) -> str:
+    """Encode JSON columns with orjson (non-string keys are stringified like json.dumps does)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Pooled connections are reused across sessions. An in-memory SQLite database lives in a
+# single connection (StaticPool), which takes no sizing arguments
+pool_args = {}
+if ":memory:" not in database_url:
+    pool_args = {
+        "pool_size": 20,  # Increased from default 5
+        "max_overflow": 30,  # Increased from default 10
+        "pool_timeout": 60,  # Increased timeout for connection acquisition
+        "pool_recycle": 1800,  # Recycle before typical server/proxy idle timeouts (Cloud SQL)
+        "pool_pre_ping": True,  # Replace connections dropped while idle instead of failing a request
+    }
+
 engine = create_async_engine(
     database_url,
     echo=settings.DEBUG,
     future=True,
-    pool_size=20,  # Increased from default 5
-    max_overflow=30,  # Increased from default 10
-    pool_timeout=60,  # Increased timeout for connection acquisition
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    connect_args=connect_args
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    connect_args=connect_args,
+    **pool_args
 )
 
+# SQLite tuning applied to every new connection: WAL lets readers run alongside the
+# writer and, with synchronous=NORMAL, avoids an fsync per commit during bulk imports.
+# foreign_keys stays off: listings are saved with product_ban_id set to recall IDs that
+# may not be stored (live CPSC results) or to "", which enforcement would reject. Deletes
+# remove child rows through ORM cascades or explicit DELETEs instead of ON DELETE CASCADE.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA temp_store=MEMORY",
+)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in _SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -54,6 +97,71 @@ AsyncSessionLocal = async_sessionmaker(
 # Base class for declarative models
 Base = declarative_base()
 
+# SQLite full-text index over product bans (title, description, ban number and the names,
+# model numbers and manufacturers of their products). The trigram tokenizer keeps the
+# substring semantics of the ILIKE search it replaces. Kept in sync by triggers.
+PRODUCT_BAN_FTS_TABLE = "product_ban_fts"
+
+_FTS_ROW_SELECT = """
+    SELECT p.product_ban_id, p.title, coalesce(p.description, ''), p.ban_number,
+           coalesce((SELECT group_concat(
+                         coalesce(pp.name, '') || ' ' || coalesce(pp.model_number, '') || ' ' || coalesce(pp.manufacturer, ''),
+                         ' ')
+                     FROM product_ban_products pp WHERE pp.product_ban_id = p.product_ban_id), '')
+    FROM product_bans p
+"""
+_FTS_INSERT = f"INSERT INTO {PRODUCT_BAN_FTS_TABLE}(product_ban_id, title, description, ban_number, products)"
+
+_SQLITE_SEARCH_INDEX_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_BAN_FTS_TABLE} USING fts5(
+        product_ban_id UNINDEXED, title, description, ban_number, products, tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_bans_fts_ai AFTER INSERT ON product_bans BEGIN
+        {_FTS_INSERT} {_FTS_ROW_SELECT} WHERE p.product_ban_id = NEW.product_ban_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_bans_fts_au AFTER UPDATE OF title, description, ban_number ON product_bans BEGIN
+        DELETE FROM {PRODUCT_BAN_FTS_TABLE} WHERE product_ban_id = OLD.product_ban_id;
+        {_FTS_INSERT} {_FTS_ROW_SELECT} WHERE p.product_ban_id = NEW.product_ban_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_bans_fts_ad AFTER DELETE ON product_bans BEGIN
+        DELETE FROM {PRODUCT_BAN_FTS_TABLE} WHERE product_ban_id = OLD.product_ban_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_ban_products_fts_ai AFTER INSERT ON product_ban_products BEGIN
+        DELETE FROM {PRODUCT_BAN_FTS_TABLE} WHERE product_ban_id = NEW.product_ban_id;
+        {_FTS_INSERT} {_FTS_ROW_SELECT} WHERE p.product_ban_id = NEW.product_ban_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_ban_products_fts_au AFTER UPDATE ON product_ban_products BEGIN
+        DELETE FROM {PRODUCT_BAN_FTS_TABLE} WHERE product_ban_id IN (OLD.product_ban_id, NEW.product_ban_id);
+        {_FTS_INSERT} {_FTS_ROW_SELECT} WHERE p.product_ban_id IN (OLD.product_ban_id, NEW.product_ban_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_ban_products_fts_ad AFTER DELETE ON product_ban_products BEGIN
+        DELETE FROM {PRODUCT_BAN_FTS_TABLE} WHERE product_ban_id = OLD.product_ban_id;
+        {_FTS_INSERT} {_FTS_ROW_SELECT} WHERE p.product_ban_id = OLD.product_ban_id;
+    END""",
+    # Backfill rows written before the index existed
+    f"""{_FTS_INSERT} {_FTS_ROW_SELECT}
+        WHERE p.product_ban_id NOT IN (SELECT product_ban_id FROM {PRODUCT_BAN_FTS_TABLE})""",
+)
+
+
+# Investigation listing counts maintained by SQLite itself: O(1) per link added or removed
+# instead of recounting the join table from Python
+_SQLITE_COUNT_TRIGGERS_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS investigation_listings_count_ai AFTER INSERT ON investigation_listings BEGIN
+        UPDATE investigations
+        SET listings_found = coalesce(listings_found, 0) + 1,
+            listings_queued = coalesce(listings_queued, 0) + 1,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE investigation_id = NEW.investigation_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS investigation_listings_count_ad AFTER DELETE ON investigation_listings BEGIN
+        UPDATE investigations
+        SET listings_found = max(coalesce(listings_found, 0) - 1, 0),
+            listings_queued = max(coalesce(listings_queued, 0) - 1, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE investigation_id = OLD.investigation_id;
+    END""",
+)
 
 async def get_session():
     """
@@ -81,7 +189,62 @@ async def init_database():
     async with engine.begin() as conn:
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+        # The unique link index can't be built over duplicate links left by older versions
+        await conn.run_sync(_dedupe_investigation_links)
+        # create_all skips existing tables, so indexes added to the models later need this
+        await conn.run_sync(_create_missing_indexes)
         logger.info("Database tables created successfully")
+    
+    if engine.dialect.name == "sqlite":
+        await _create_sqlite_search_index()
+        await _create_sqlite_count_triggers()
+
+
+_INVESTIGATION_LINKS_UNIQUE_INDEX = "uq_investigation_listings_investigation_listing"
+
+
+def _dedupe_investigation_links(sync_conn):
+    """Keep one link per (investigation, listing) before the unique index is first created."""
+    existing = {ix["name"] for ix in inspect(sync_conn).get_indexes("investigation_listings")}
+    if _INVESTIGATION_LINKS_UNIQUE_INDEX in existing:
+        return
+    result = sync_conn.execute(text(
+        "DELETE FROM investigation_listings WHERE id NOT IN ("
+        "SELECT MIN(id) FROM investigation_listings GROUP BY investigation_id, listing_id)"
+    ))
+    if result.rowcount:
+        logger.info(f"Removed {result.rowcount} duplicate investigation listing links")
+
+
+def _create_missing_indexes(sync_conn):
+    """Create any model index that an existing database doesn't have yet."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with sync_conn.begin_nested():
+                    index.create(sync_conn, checkfirst=True)
+            except (IntegrityError, OperationalError) as e:
+                # e.g. a unique index over rows that already contain duplicates
+                logger.warning(f"Could not create index {index.name}: {e}")
+
+
+async def _create_sqlite_search_index():
+    """Create the FTS5 product ban index and its sync triggers (needs SQLite 3.34+ for trigram)."""
+    try:
+        async with engine.begin() as conn:
+            for statement in _SQLITE_SEARCH_INDEX_DDL:
+                await conn.execute(text(statement))
+        logger.info("Product ban search index ready")
+    except OperationalError as e:
+        # Search falls back to ILIKE when the index is unavailable
+        logger.warning(f"Could not create product ban search index: {e}")
+
+
+async def _create_sqlite_count_triggers():
+    """Create the triggers that keep investigations.listings_found in step with their links."""
+    async with engine.begin() as conn:
+        for statement in _SQLITE_COUNT_TRIGGERS_DDL:
+            await conn.execute(text(statement))
 
 
 async def close_database():
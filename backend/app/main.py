@@ -7,16 +7,30 @@ Main application entry point with API routes and MCP server integration.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+import atexit
 import logging
+import queue
 
 from app.routers import recalls, marketplaces, search, agent, listings, imports, organizations
 from app.services.database import init_db
 from app.db.session import init_database as init_db_tables
 from app.services.investigation_scheduler import start_scheduler, stop_scheduler
+from app.services.api_import_service import warm_up_connections, close_http_client
+from app.services.cpsc_api import close_cpsc_client
+from app.services.cache import close_cache
+from app.services.credential_encryption import check_encryption_key_configured
 from app.config import settings
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: handlers only enqueue records; a background thread formats and
+# writes them so log I/O never blocks the event loop
+_log_queue = queue.SimpleQueue()
+_log_output = logging.StreamHandler()
+_log_output.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+_log_listener = QueueListener(_log_queue, _log_output)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Import optional routers with error handling
@@ -47,6 +61,7 @@ async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown events."""
     # Startup
     logger.info("Starting Altitude Recall Monitor...")
+    check_encryption_key_configured()
     await init_db_tables()  # Create database tables
     await init_db()  # Initialize with default data
     logger.info("Database initialized")
@@ -58,11 +73,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to start scheduler: {e}")
     
+    # Pre-open connections to organization API endpoints
+    try:
+        await warm_up_connections()
+    except Exception as e:
+        logger.warning(f"Failed to warm up API connections: {e}")
+    
     yield
     # Shutdown
     logger.info("Shutting down Altitude Recall Monitor...")
     await stop_scheduler()
     logger.info("Investigation scheduler stopped")
+    await close_http_client()
+    await close_cpsc_client()
+    await close_cache()
 
 
 app = FastAPI(
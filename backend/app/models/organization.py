@@ -69,6 +69,9 @@ class Organization(BaseModel):
     api_key: Optional[str] = None  # Encrypted
     api_headers: Dict[str, str] = Field(default_factory=dict, description="Custom API headers")
     api_enabled: bool = False
+    api_max_concurrency: Optional[int] = Field(None, description="Max concurrent requests to the API host (default and maximum 8)")
+    api_rate_per_min: Optional[int] = Field(None, description="Max API requests per minute (default 60)")
+    api_http2_enabled: bool = Field(False, description="Use HTTP/2 multiplexing for API requests")
     
     # API import schedule configuration
     api_import_schedule: Optional[str] = Field(None, description="API import schedule: 'daily', 'weekly', 'monthly', 'none'")
@@ -146,6 +149,9 @@ class OrganizationCreate(BaseModel):
     api_auth_type: Optional[str] = None  # 'bearer', 'basic', 'api_key', 'none'
     api_key: Optional[str] = None
     api_headers: Dict[str, str] = Field(default_factory=dict)
+    api_max_concurrency: Optional[int] = None
+    api_rate_per_min: Optional[int] = None
+    api_http2_enabled: bool = False
     
     # API import schedule configuration
     api_import_schedule: Optional[str] = None  # 'daily', 'weekly', 'monthly', 'none'
@@ -195,6 +201,9 @@ class OrganizationUpdate(BaseModel):
     api_key: Optional[str] = None
     api_headers: Optional[Dict[str, str]] = None
     api_enabled: Optional[bool] = None
+    api_max_concurrency: Optional[int] = None
+    api_rate_per_min: Optional[int] = None
+    api_http2_enabled: Optional[bool] = None
     
     # API import schedule updates
     api_import_schedule: Optional[str] = None
@@ -19,7 +19,7 @@ from app.models.risk_classification import (
 from app.models.product_ban import ProductBan
 from app.skills.risk_classifier import classify_violation
 from app.services import database as db
-from app.services.credential_encryption import credential_encryption
+from app.services.credential_encryption import encrypt_string, clear_decrypt_cache
 
 router = APIRouter()
 
@@ -42,9 +42,12 @@ async def update_agent_config(updates: AgentConfigUpdate):
     # Encrypt API key if provided (and not already masked)
     if "llm_api_key" in update_data and update_data["llm_api_key"]:
         if update_data["llm_api_key"] != "***configured***":
-            update_data["llm_api_key"] = credential_encryption.encrypt_string(update_data["llm_api_key"])
+            update_data["llm_api_key"] = encrypt_string(update_data["llm_api_key"])
     
     updated = await db.update_agent_config(update_data)
+    if "llm_api_key" in update_data:
+        # Don't keep the replaced key's plaintext around
+        clear_decrypt_cache()
     
     # Mask API key in response
     if updated.llm_api_key:
@@ -178,16 +181,13 @@ async def update_skill(skill_id: str, updates: SkillUpdate):
     """Update an existing skill."""
     config = await db.get_agent_config()
     
-    skill = next((s for s in config.skills if s.skill_id == skill_id), None)
-    if not skill:
+    index = next((i for i, s in enumerate(config.skills) if s.skill_id == skill_id), None)
+    if index is None:
         raise HTTPException(status_code=404, detail=f"Skill '{skill_id}' not found")
     
     update_data = updates.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        if hasattr(skill, key):
-            setattr(skill, key, value)
-    
-    skill.updated_at = datetime.utcnow()
+    skill = config.skills[index].model_copy(update={**update_data, "updated_at": datetime.utcnow()})
+    config.skills[index] = skill
     await db.update_agent_config({"skills": config.skills})
     
     return skill
@@ -1634,7 +1634,8 @@ async def import_violations_from_api(request: ViolationImportRequest):
             auth_type=request.api_auth.get("type", "none") if request.api_auth else "none",
             basic_auth=basic_auth,
             params=None,
-            timeout=30.0
+            timeout=30.0,
+            max_concurrency=organization.api_max_concurrency
         )
         
         if not items:
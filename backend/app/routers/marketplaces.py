@@ -19,21 +19,38 @@ from app.models.marketplace import (
     NotificationType
 )
 from app.services import database as db
-from app.services.credential_encryption import credential_encryption
+from app.services.credential_encryption import encrypt_credentials, decrypt_credentials, clear_decrypt_cache
 from app.services.marketplace_risk_calculator import risk_calculator
 
 router = APIRouter()
 
+_CREDENTIAL_MASK = "***configured***"
+
+
+def _mask_credentials(marketplace: Marketplace) -> Marketplace:
+    """Copy of the marketplace whose portal credentials show only which fields are set."""
+    stored = marketplace.notification_portal_credentials
+    if not stored:
+        return marketplace
+    try:
+        names = decrypt_credentials(stored).keys()
+    except Exception:
+        # Unreadable (plaintext or corrupted): the stored keys are still the field names
+        names = stored.keys()
+    return marketplace.model_copy(
+        update={"notification_portal_credentials": dict.fromkeys(names, _CREDENTIAL_MASK)}
+    )
+
 
 @router.get("/", response_model=List[Marketplace])
 async def list_marketplaces(enabled_only: bool = Query(False)):
-    """List all configured marketplaces."""
+    """List all configured marketplaces (portal credentials masked)."""
     marketplaces = await db.get_all_marketplaces()
     
     if enabled_only:
         marketplaces = [m for m in marketplaces if m.enabled]
     
-    return marketplaces
+    return [_mask_credentials(m) for m in marketplaces]
 
 
 @router.get("/{marketplace_id}", response_model=Marketplace)
@@ -46,7 +63,7 @@ async def get_marketplace(marketplace_id: str):
     # Decrypt credentials before returning (if they exist)
     if marketplace.notification_portal_credentials:
         try:
-            decrypted = credential_encryption.decrypt_credentials(
+            decrypted = decrypt_credentials(
                 marketplace.notification_portal_credentials
             )
             marketplace.notification_portal_credentials = decrypted
@@ -87,7 +104,7 @@ async def update_marketplace(marketplace_id: str, updates: MarketplaceUpdate):
     
     # Encrypt portal credentials if provided
     if "notification_portal_credentials" in update_data and update_data["notification_portal_credentials"]:
-        update_data["notification_portal_credentials"] = credential_encryption.encrypt_credentials(
+        update_data["notification_portal_credentials"] = encrypt_credentials(
             update_data["notification_portal_credentials"]
         )
     
@@ -97,11 +114,14 @@ async def update_marketplace(marketplace_id: str, updates: MarketplaceUpdate):
     updated = await db.update_marketplace(marketplace_id, update_data)
     if not updated:
         raise HTTPException(status_code=404, detail="Marketplace not found")
+    if "notification_portal_credentials" in update_data:
+        # Don't keep the replaced credentials' plaintext around
+        clear_decrypt_cache()
     
     # Decrypt credentials before returning (if they exist)
     if updated.notification_portal_credentials:
         try:
-            decrypted = credential_encryption.decrypt_credentials(
+            decrypted = decrypt_credentials(
                 updated.notification_portal_credentials
             )
             updated.notification_portal_credentials = decrypted
@@ -10,6 +10,7 @@ from uuid import uuid4
 
 from app.models.organization import Organization, OrganizationCreate, OrganizationUpdate, OrganizationType, OrganizationStatus
 from app.services import database as db
+from app.services.credential_encryption import clear_decrypt_cache
 
 router = APIRouter()
 
@@ -73,6 +74,9 @@ async def update_organization(organization_id: str, updates: OrganizationUpdate)
     updated_org = await db.update_organization(organization_id, updates)
     if not updated_org:
         raise HTTPException(status_code=404, detail="Organization not found")
+    if "api_key" in updates.model_fields_set:
+        # Don't keep the replaced key's plaintext around
+        clear_decrypt_cache()
     return updated_org
 
 
@@ -159,8 +159,7 @@ async def search_marketplaces(request: MarketplaceSearchRequest):
         )
         
         # Save listings to database
-        for listing in listings:
-            await db.save_listing(listing)
+        await db.save_listings_bulk(listings)
         
         # Calculate duration
         duration_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
@@ -232,8 +231,7 @@ async def execute_search_task(task_id: str):
                 )
                 all_listings.extend(listings)
                 
-                for listing in listings:
-                    await db.save_listing(listing)
+                await db.save_listings_bulk(listings)
                 
                 task.items_processed = i + 1
                 task.progress = (i + 1) / len(marketplaces)
@@ -30,29 +30,15 @@ async def list_product_bans(
     Returns lightweight summaries for performance.
     """
     try:
-        product_bans = await db.get_all_violations()  # TODO: Rename to get_all_product_bans
-        
-        # Filter by risk level if specified
-        if risk_level:
-            product_bans = [v for v in product_bans if v.risk_level == risk_level]
-        
-        # Filter by agency if specified
-        if agency_name:
-            product_bans = [v for v in product_bans if v.agency_name.lower() == agency_name.lower()]
-        
-        # Filter by country if specified
-        if country:
-            product_bans = [v for v in product_bans if v.country == country]
-        
-        # Filter by ban type if specified
-        if ban_type:
-            product_bans = [v for v in product_bans if v.ban_type == ban_type]
-        
-        # Sort by date (newest first) then by risk score
-        product_bans.sort(key=lambda v: (v.ban_date or datetime.min, v.risk_score), reverse=True)
-        
-        # Paginate
-        product_bans = product_bans[offset:offset + limit]
+        # Filter, sort (newest first, then by risk score) and paginate in the database
+        product_bans = await db.list_product_bans(
+            risk_level=risk_level,
+            agency_name=agency_name,
+            country=country,
+            ban_type=ban_type,
+            limit=limit,
+            offset=offset
+        )
         
         # Convert to summaries
         summaries = []
@@ -8,48 +8,138 @@ Supports organization-based configurations and manual API imports.
 import asyncio
 import logging
 import uuid
+from contextlib import nullcontext
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import httpx
+from aiolimiter import AsyncLimiter
 from dateutil import parser as date_parser
 
 from app.services import database as db
-from app.services.credential_encryption import credential_encryption
+from app.services.credential_encryption import decrypt_string
 from app.models.product_ban import ProductBanCreate
 from app.models.organization import Organization
 
 logger = logging.getLogger(__name__)
 
+# Fallback keys checked (in order) when the field mapping did not produce a value
+_ID_KEYS = ("id", "recall_number", "violation_number")
+_TITLE_KEYS = ("title", "name", "product_name")
+_URL_KEYS = ("url", "source_url", "link")
+
+# Per-host admission gate so organizations sharing an upstream don't exhaust its rate limit.
+# Semaphores are never replaced, so every in-flight request stays counted: the host one caps
+# all callers, and a lower api_max_concurrency adds one shared by callers with that limit.
+_HOST_CONCURRENCY = 8
+_host_sems: Dict[str, asyncio.Semaphore] = {}
+_host_limit_sems: Dict[Tuple[str, int], asyncio.Semaphore] = {}  # (host, limit) -> semaphore
+
+
+def _get_host_semaphores(url: str, max_concurrency: Optional[int] = None) -> Tuple[asyncio.Semaphore, Optional[asyncio.Semaphore]]:
+    """Get the URL host's semaphore and, for a limit below the host cap, the semaphore for that limit."""
+    host = httpx.URL(url).host
+    host_sem = _host_sems.get(host)
+    if host_sem is None:
+        host_sem = _host_sems[host] = asyncio.Semaphore(_HOST_CONCURRENCY)
+    if not max_concurrency or max_concurrency >= _HOST_CONCURRENCY:
+        return host_sem, None
+    limit_sem = _host_limit_sems.get((host, max_concurrency))
+    if limit_sem is None:
+        limit_sem = _host_limit_sems[(host, max_concurrency)] = asyncio.Semaphore(max_concurrency)
+    return host_sem, limit_sem
+
+
+# Shared clients (keyed by HTTP/2 support) so keep-alive connections are reused across polls
+_DEFAULT_TIMEOUT = 30.0
+_CLIENT_TIMEOUT = httpx.Timeout(connect=5.0, read=_DEFAULT_TIMEOUT, write=10.0, pool=5.0)
+_clients: Dict[bool, httpx.AsyncClient] = {}
+
+
+def _get_client(http2: bool = False) -> httpx.AsyncClient:
+    """Get the shared HTTP/1.1 or HTTP/2 client, creating it on first use."""
+    client = _clients.get(http2)
+    if client is None or client.is_closed:
+        client = _clients[http2] = httpx.AsyncClient(http2=http2, timeout=_CLIENT_TIMEOUT)
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP clients (called on application shutdown)."""
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+async def warm_up_connections(timeout: float = 5.0) -> None:
+    """
+    Open keep-alive connections to every enabled organization API endpoint.
+    Issues a HEAD request per endpoint so the TLS/TCP handshake is paid at startup
+    and the first real poll reuses the pooled connection. Failures are ignored.
+    """
+    organizations = await db.get_organizations()
+    endpoints = {
+        (org.api_endpoint, org.api_http2_enabled)
+        for org in organizations
+        if org.api_enabled and org.api_endpoint
+    }
+    if not endpoints:
+        return
+    
+    results = await asyncio.gather(
+        *[_get_client(http2).head(endpoint, timeout=timeout) for endpoint, http2 in endpoints],
+        return_exceptions=True
+    )
+    warmed = sum(1 for r in results if not isinstance(r, Exception))
+    logger.info(f"Warmed {warmed}/{len(endpoints)} organization API connections")
+
+
+# Per-organization token buckets keyed by organization_id -> (rate, limiter)
+_DEFAULT_RATE_PER_MIN = 60
+_org_limiters: Dict[str, Tuple[int, AsyncLimiter]] = {}
+
+
+def _get_org_rate_limiter(organization: Organization) -> AsyncLimiter:
+    """Get the cached rate limiter for an organization, rebuilding it if its rate changed."""
+    rate = organization.api_rate_per_min or _DEFAULT_RATE_PER_MIN
+    cached = _org_limiters.get(organization.organization_id)
+    if cached is None or cached[0] != rate:
+        cached = _org_limiters[organization.organization_id] = (rate, AsyncLimiter(max_rate=rate, time_period=60))
+    return cached[1]
+
 
 def build_auth_headers(api_auth_type: str, api_key: Optional[str], api_headers: Dict[str, str]) -> Tuple[Dict[str, str], Optional[Tuple[str, str]]]:
     """
     Build authentication headers and basic auth tuple.
     Returns: (headers_dict, basic_auth_tuple_or_none)
+    
+    When no auth header is added, api_headers is returned as-is rather than
+    copied, so callers must not mutate the returned headers dict. Nothing is
+    memoized here: the result carries the plaintext credential.
     """
-    headers = api_headers.copy() if api_headers else {}
-    basic_auth = None
+    if not api_key:
+        return api_headers or {}, None
     
-    if api_auth_type == "bearer" and api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    elif api_auth_type == "basic" and api_key:
+    if api_auth_type == "bearer":
+        return {**(api_headers or {}), "Authorization": f"Bearer {api_key}"}, None
+    if api_auth_type == "api_key":
+        # API key in custom header (default X-API-Key, can be configured)
+        return {**(api_headers or {}), "X-API-Key": api_key}, None
+    if api_auth_type == "basic":
         # Basic auth: api_key should be "username:password"
         try:
             username, password = api_key.split(":", 1)
-            basic_auth = (username, password)
+            return api_headers or {}, (username, password)
         except ValueError:
             # If not in username:password format, use as password with empty username
-            basic_auth = ("", api_key)
-    elif api_auth_type == "api_key" and api_key:
-        # API key in custom header (default X-API-Key, can be configured)
-        headers["X-API-Key"] = api_key
+            return api_headers or {}, ("", api_key)
     
-    return headers, basic_auth
+    return api_headers or {}, None
 
 
 async def fetch_from_organization_api(
     organization_id: str,
     params: Optional[Dict[str, Any]] = None,
-    timeout: float = 30.0
+    timeout: float = _DEFAULT_TIMEOUT
 ) -> List[Dict[str, Any]]:
     """
     Fetch data from an organization's configured API endpoint.
@@ -81,7 +171,7 @@ async def fetch_from_organization_api(
     api_key = None
     if organization.api_key:
         try:
-            api_key = credential_encryption.decrypt_string(organization.api_key)
+            api_key = decrypt_string(organization.api_key)
         except Exception as e:
             logger.warning(f"Failed to decrypt API key for organization {organization_id}: {e}")
     
@@ -91,6 +181,10 @@ async def fetch_from_organization_api(
         api_key,
         organization.api_headers or {}
     )
+    # Drop this frame's reference to the plaintext key. It remains in the request-scoped
+    # headers/basic_auth until this call returns, and in the credential decrypt cache
+    # for up to _DECRYPT_CACHE_TTL_SECONDS (or until the key is updated)
+    del api_key
     
     # Make API request
     url = organization.api_endpoint
@@ -103,7 +197,10 @@ async def fetch_from_organization_api(
         auth_type=organization.api_auth_type or "none",
         basic_auth=basic_auth,
         params=params,
-        timeout=timeout
+        timeout=timeout,
+        max_concurrency=organization.api_max_concurrency,
+        rate_limiter=_get_org_rate_limiter(organization),
+        http2=organization.api_http2_enabled
     )
 
 
@@ -114,8 +211,11 @@ async def fetch_from_api_url(
     auth_type: str = "none",
     basic_auth: Optional[Tuple[str, str]] = None,
     params: Optional[Dict[str, Any]] = None,
-    timeout: float = 30.0,
-    max_retries: int = 3
+    timeout: float = _DEFAULT_TIMEOUT,
+    max_retries: int = 3,
+    max_concurrency: Optional[int] = None,
+    rate_limiter: Optional[AsyncLimiter] = None,
+    http2: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Fetch data from an API URL with retry logic.
@@ -129,6 +229,9 @@ async def fetch_from_api_url(
         params: Query parameters (for GET) or body (for POST)
         timeout: Request timeout in seconds
         max_retries: Maximum number of retry attempts
+        max_concurrency: Max concurrent requests to the URL's host for this caller (the host cap of 8 always applies)
+        rate_limiter: Optional token bucket to acquire from before each request
+        http2: Use the shared HTTP/2 client to multiplex requests to the host
         
     Returns:
         List of items from API response
@@ -137,45 +240,51 @@ async def fetch_from_api_url(
         httpx.HTTPError: If API request fails after retries
     """
     headers = headers or {}
+    host_sem, limit_sem = _get_host_semaphores(url, max_concurrency)
     
     last_error = None
     for attempt in range(max_retries):
         try:
-            async with httpx.AsyncClient() as client:
-                # Prepare request
-                request_kwargs = {
-                    "method": method,
-                    "url": url,
-                    "headers": headers,
-                    "timeout": timeout,
-                }
-                
-                # Add auth
-                if basic_auth:
-                    request_kwargs["auth"] = basic_auth
-                
-                # Add params or json body
-                if params:
-                    if method.upper() == "GET":
-                        request_kwargs["params"] = params
-                    else:
-                        request_kwargs["json"] = params
-                
+            client = _get_client(http2)
+            # Prepare request
+            request_kwargs = {
+                "method": method,
+                "url": url,
+                "headers": headers,
+            }
+            # The client carries a prebuilt Timeout; only override for non-default values
+            if timeout != _DEFAULT_TIMEOUT:
+                request_kwargs["timeout"] = timeout
+            
+            # Add auth
+            if basic_auth:
+                request_kwargs["auth"] = basic_auth
+            
+            # Add params or json body
+            if params:
+                if method.upper() == "GET":
+                    request_kwargs["params"] = params
+                else:
+                    request_kwargs["json"] = params
+            
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            async with limit_sem or nullcontext(), host_sem:
                 response = await client.request(**request_kwargs)
-                
-                # Handle rate limiting
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    if attempt < max_retries - 1:
-                        logger.warning(f"Rate limited. Retrying after {retry_after} seconds...")
-                        await asyncio.sleep(retry_after)
-                        continue
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                # Parse response into list of items
-                return parse_api_response(data)
+            
+            # Handle rate limiting
+            if response.status_code == 429:
+                retry_after = int(response.headers.get("Retry-After", 60))
+                if attempt < max_retries - 1:
+                    logger.warning(f"Rate limited. Retrying after {retry_after} seconds...")
+                    await asyncio.sleep(retry_after)
+                    continue
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            # Parse response into list of items
+            return parse_api_response(data)
                 
         except httpx.HTTPStatusError as e:
             last_error = e
@@ -265,13 +374,15 @@ async def map_api_fields_to_product_ban(
     
     # Ensure required fields
     if 'ban_number' not in mapped_fields and 'violation_number' not in mapped_fields:
-        mapped_fields['ban_number'] = item.get('id') or item.get('recall_number') or item.get('violation_number') or f"API-{uuid.uuid4().hex[:8]}"
+        mapped_fields['ban_number'] = next(
+            (item[k] for k in _ID_KEYS if item.get(k)), None
+        ) or f"API-{uuid.uuid4().hex[:8]}"
     
     if 'title' not in mapped_fields:
-        mapped_fields['title'] = item.get('title') or item.get('name') or item.get('product_name') or "Imported Product Ban"
+        mapped_fields['title'] = next((item[k] for k in _TITLE_KEYS if item.get(k)), "Imported Product Ban")
     
     if 'url' not in mapped_fields:
-        mapped_fields['url'] = item.get('url') or item.get('source_url') or item.get('link') or ""
+        mapped_fields['url'] = next((item[k] for k in _URL_KEYS if item.get(k)), "")
     
     # Set organization information
     mapped_fields['organization_name'] = organization.name
@@ -0,0 +1,113 @@
+"""
+Read-through cache for hot, read-mostly queries.
+Backed by Redis when REDIS_URL is set; otherwise every call is a no-op and
+callers go straight to the database.
+"""
+
+from functools import wraps
+from typing import Any, Callable, Optional
+import logging
+
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+_redis_unavailable = False
+
+
+def get_redis():
+    """Return the shared Redis client, or None if caching is disabled/unavailable."""
+    global _redis, _redis_unavailable
+    if _redis is not None or _redis_unavailable:
+        return _redis
+    if not settings.REDIS_URL:
+        _redis_unavailable = True
+        return None
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("redis package not installed; query cache disabled. Install with: pip install redis")
+        _redis_unavailable = True
+        return None
+    _redis = redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def close_cache() -> None:
+    """Close the Redis client (called on application shutdown)."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Get a cached JSON value, or None on a miss (or any cache error)."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON-serializable value for ttl seconds."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, orjson.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+
+async def cache_delete(*keys: str) -> None:
+    """Invalidate cached keys."""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        await client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {keys}: {e}")
+
+
+async def cache_delete_prefix(prefix: str) -> None:
+    """Invalidate every cached key starting with prefix."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        keys = [key async for key in client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {prefix}*: {e}")
+
+
+def cached(key: str, ttl: int) -> Callable:
+    """
+    Cache the JSON-serializable result of an argument-less coroutine under key.
+
+    Args:
+        key: Cache key
+        ttl: Time to live in seconds
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper():
+            hit = await cache_get(key)
+            if hit is not None:
+                return hit
+            value = await func()
+            await cache_set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
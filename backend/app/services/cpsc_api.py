@@ -5,511 +5,98 @@ Service for fetching recalls from the Consumer Product Safety Commission API.
 https://www.saferproducts.gov/RestWebServices
 """
 
+import asyncio
+from collections import OrderedDict
 import httpx
-from typing import List, Optional
+import orjson
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
+import re
+import time
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from app.config import settings
 from app.models.recall import Recall, RecallImage, RecallProduct, RecallHazard, RecallRemedy
-from app.skills.risk_classifier import classify_recall
+from app.skills.risk_classifier import classify_recall, get_risk_classification_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Max classify_recall calls in flight per page of results
+_CLASSIFY_CONCURRENCY = 16
 
-class CPSCApiClient:
-    """Client for the CPSC REST API."""
-    
-    BASE_URL = "https://www.saferproducts.gov/RestWebServices"
-    
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
-    
-    async def fetch_recalls(
-        self,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
-        product_type: Optional[str] = None,
-        limit: int = 100
-    ) -> List[Recall]:
-        """
-        Fetch recalls from the CPSC API.
-        
-        Args:
-            start_date: Filter recalls from this date
-            end_date: Filter recalls until this date
-            product_type: Filter by product type
-            limit: Maximum number of recalls to return
-        
-        Returns:
-            List of parsed Recall objects
-        """
-        params = {
-            "format": "json",
-            "RecallDateStart": (start_date or datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d"),
-        }
-        
-        if end_date:
-            params["RecallDateEnd"] = end_date.strftime("%Y-%m-%d")
-        
-        if product_type:
-            params["ProductType"] = product_type
-        
-        try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params=params
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
-            
-            logger.info(f"Fetched {len(recalls)} recalls from CPSC API")
-            return recalls
-            
-        except httpx.HTTPError as e:
-            logger.error(f"CPSC API error: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Error parsing CPSC data: {e}")
-            return []
-    
-    async def search_recalls(self, query: str, limit: int = 50) -> List[Recall]:
-        """
-        Search recalls by keyword.
-        
-        Args:
-            query: Search query
-            limit: Maximum results
-        
-        Returns:
-            List of matching recalls
-        """
-        try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallTitle": query
-                }
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
-            
-            return recalls
-            
-        except Exception as e:
-            logger.error(f"CPSC search error: {e}")
-            return []
-    
-    async def get_recall_by_number(self, recall_number: str) -> Optional[Recall]:
-        """
-        Get a specific recall by its number.
-        
-        Args:
-            recall_number: The CPSC recall number
-        
-        Returns:
-            Recall object if found, None otherwise
-        """
-        try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallNumber": recall_number
-                }
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            if data:
-                recall = self._parse_cpsc_recall(data[0])
-                if recall:
-                    return await classify_recall(recall)
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error fetching recall {recall_number}: {e}")
-            return None
-    
-    def _parse_cpsc_recall(self, data: dict) -> Optional[Recall]:
-        """Parse a CPSC API response into a Recall model."""
-        try:
-            recall_number = data.get("RecallNumber", "")
-            recall_id = f"cpsc-{recall_number}"
-            
-            # Parse products
-            products = []
-            for p in data.get("Products", []):
-                products.append(RecallProduct(
-                    name=p.get("Name", "Unknown"),
-                    description=p.get("Description", ""),
-                    model_number=p.get("Model", ""),
-                    manufacturer=data.get("Manufacturers", [{}])[0].get("Name", "") if data.get("Manufacturers") else ""
-                ))
-            
-            # Parse images
-            images = []
-            for img in data.get("Images", []):
-                url = img.get("URL", "")
-                if url:
-                    images.append(RecallImage(url=url))
-            
-            # Parse hazards
-            hazards = []
-            for h in data.get("Hazards", []):
-                hazards.append(RecallHazard(
-                    description=h.get("Name", ""),
-                    hazard_type=h.get("HazardType", "")
-                ))
-            
-            # Parse remedies
-            remedies = []
-            for r in data.get("Remedies", []):
-                remedies.append(RecallRemedy(
-                    description=r.get("Name", "")
-                ))
-            
-            # Parse date
-            recall_date = datetime.now()
-            date_str = data.get("RecallDate", "")
-            if date_str:
-                try:
-                    recall_date = datetime.strptime(date_str, "%Y-%m-%d")
-                except:
-                    pass
-            
-            # Parse units
-            units_str = data.get("NumberOfUnits", "0")
-            units = 0
-            if units_str:
-                try:
-                    units = int(str(units_str).replace(",", "").replace("About", "").strip())
-                except:
-                    pass
-            
-            return Recall(
-                recall_id=recall_id,
-                recall_number=recall_number,
-                title=data.get("Title", f"Recall {recall_number}"),
-                description=data.get("Description", ""),
-                recall_date=recall_date,
-                units_sold=units,
-                injuries=self._safe_int(data.get("Injuries")),
-                deaths=self._safe_int(data.get("Deaths")),
-                incidents=self._safe_int(data.get("Incidents")),
-                products=products,
-                images=images,
-                hazards=hazards,
-                remedies=remedies,
-                source="CPSC",
-                source_url=data.get("URL", "")
-            )
-            
-        except Exception as e:
-            logger.error(f"Error parsing CPSC recall: {e}")
-            return None
-    
-    def _safe_int(self, value) -> int:
-        """Safely convert a value to int."""
-        if value is None:
-            return 0
-        try:
-            return int(str(value).replace(",", ""))
-        except:
-            return 0
+# Recalls rarely change after publication: remember classifications for this many records (LRU)
+_CLASSIFY_CACHE_MAX_ENTRIES = 4096
 
+# How often to check whether the risk rules changed (the agent config is itself cached for a minute)
+_RISK_CONFIG_CHECK_SECONDS = 60
 
-# Singleton instance
-cpsc_client = CPSCApiClient()
+# Pages at least this large are parsed in a worker thread to keep the event loop responsive
+_PARSE_IN_THREAD_MIN = 50
 
+# Recalls change at most daily: cache parsed pages and revalidate stale ones with ETag/Last-Modified
+_CACHE_TTL_SECONDS = 3600
+_CACHE_MAX_ENTRIES = 256
 
+# Circuit breaker: after this many consecutive failed requests, fail fast for a cool-down period
+_CIRCUIT_FAILURE_THRESHOLD = 5
+_CIRCUIT_COOLDOWN_SECONDS = 30
 
-CPSC API Integration
-====================
-Service for fetching recalls from the Consumer Product Safety Commission API.
-https://www.saferproducts.gov/RestWebServices
-"""
+# Integer parsing: drop thousands separators in one pass, fall back to the first digit run
+_INT_TRANS = str.maketrans({",": None})
+_INT_RE = re.compile(r"-?\d+")
 
-import httpx
-from typing import List, Optional
-from datetime import datetime, timedelta
-import logging
 
-from app.config import settings
-from app.models.recall import Recall, RecallImage, RecallProduct, RecallHazard, RecallRemedy
-from app.skills.risk_classifier import classify_recall
+def _parse_int(s: str) -> int:
+    """Parse a cleaned numeric string, falling back to its first integer run (or 0)."""
+    digits = s[1:] if s.startswith("-") else s
+    if digits.isdecimal():
+        return int(s)
+    match = _INT_RE.search(s)
+    return int(match.group()) if match else 0
 
-logger = logging.getLogger(__name__)
 
+def parse_cpsc_count(value) -> int:
+    """Convert a CPSC count to int, taking the first integer in free text such as "About 1,200" (0 if none)."""
+    if not value:
+        return 0
+    # JSON numbers arrive already decoded
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    s = str(value)
+    if "," in s:
+        s = s.translate(_INT_TRANS)
+    return _parse_int(s)
 
-class CPSCApiClient:
-    """Client for the CPSC REST API."""
-    
-    BASE_URL = "https://www.saferproducts.gov/RestWebServices"
-    
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
-    
-    async def fetch_recalls(
-        self,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
-        product_type: Optional[str] = None,
-        limit: int = 100
-    ) -> List[Recall]:
-        """
-        Fetch recalls from the CPSC API.
-        
-        Args:
-            start_date: Filter recalls from this date
-            end_date: Filter recalls until this date
-            product_type: Filter by product type
-            limit: Maximum number of recalls to return
-        
-        Returns:
-            List of parsed Recall objects
-        """
-        params = {
-            "format": "json",
-            "RecallDateStart": (start_date or datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d"),
-        }
-        
-        if end_date:
-            params["RecallDateEnd"] = end_date.strftime("%Y-%m-%d")
-        
-        if product_type:
-            params["ProductType"] = product_type
-        
-        try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params=params
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
-            
-            logger.info(f"Fetched {len(recalls)} recalls from CPSC API")
-            return recalls
-            
-        except httpx.HTTPError as e:
-            logger.error(f"CPSC API error: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Error parsing CPSC data: {e}")
-            return []
-    
-    async def search_recalls(self, query: str, limit: int = 50) -> List[Recall]:
-        """
-        Search recalls by keyword.
-        
-        Args:
-            query: Search query
-            limit: Maximum results
-        
-        Returns:
-            List of matching recalls
-        """
-        try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallTitle": query
-                }
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
-            
-            return recalls
-            
-        except Exception as e:
-            logger.error(f"CPSC search error: {e}")
-            return []
-    
-    async def get_recall_by_number(self, recall_number: str) -> Optional[Recall]:
-        """
-        Get a specific recall by its number.
-        
-        Args:
-            recall_number: The CPSC recall number
-        
-        Returns:
-            Recall object if found, None otherwise
-        """
-        try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallNumber": recall_number
-                }
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            if data:
-                recall = self._parse_cpsc_recall(data[0])
-                if recall:
-                    return await classify_recall(recall)
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error fetching recall {recall_number}: {e}")
-            return None
-    
-    def _parse_cpsc_recall(self, data: dict) -> Optional[Recall]:
-        """Parse a CPSC API response into a Recall model."""
-        try:
-            recall_number = data.get("RecallNumber", "")
-            recall_id = f"cpsc-{recall_number}"
-            
-            # Parse products
-            products = []
-            for p in data.get("Products", []):
-                products.append(RecallProduct(
-                    name=p.get("Name", "Unknown"),
-                    description=p.get("Description", ""),
-                    model_number=p.get("Model", ""),
-                    manufacturer=data.get("Manufacturers", [{}])[0].get("Name", "") if data.get("Manufacturers") else ""
-                ))
-            
-            # Parse images
-            images = []
-            for img in data.get("Images", []):
-                url = img.get("URL", "")
-                if url:
-                    images.append(RecallImage(url=url))
-            
-            # Parse hazards
-            hazards = []
-            for h in data.get("Hazards", []):
-                hazards.append(RecallHazard(
-                    description=h.get("Name", ""),
-                    hazard_type=h.get("HazardType", "")
-                ))
-            
-            # Parse remedies
-            remedies = []
-            for r in data.get("Remedies", []):
-                remedies.append(RecallRemedy(
-                    description=r.get("Name", "")
-                ))
-            
-            # Parse date
-            recall_date = datetime.now()
-            date_str = data.get("RecallDate", "")
-            if date_str:
-                try:
-                    recall_date = datetime.strptime(date_str, "%Y-%m-%d")
-                except:
-                    pass
-            
-            # Parse units
-            units_str = data.get("NumberOfUnits", "0")
-            units = 0
-            if units_str:
-                try:
-                    units = int(str(units_str).replace(",", "").replace("About", "").strip())
-                except:
-                    pass
-            
-            return Recall(
-                recall_id=recall_id,
-                recall_number=recall_number,
-                title=data.get("Title", f"Recall {recall_number}"),
-                description=data.get("Description", ""),
-                recall_date=recall_date,
-                units_sold=units,
-                injuries=self._safe_int(data.get("Injuries")),
-                deaths=self._safe_int(data.get("Deaths")),
-                incidents=self._safe_int(data.get("Incidents")),
-                products=products,
-                images=images,
-                hazards=hazards,
-                remedies=remedies,
-                source="CPSC",
-                source_url=data.get("URL", "")
-            )
-            
-        except Exception as e:
-            logger.error(f"Error parsing CPSC recall: {e}")
-            return None
-    
-    def _safe_int(self, value) -> int:
-        """Safely convert a value to int."""
-        if value is None:
-            return 0
-        try:
-            return int(str(value).replace(",", ""))
-        except:
-            return 0
-
-
-# Singleton instance
-cpsc_client = CPSCApiClient()
 
+def _build(model, **fields):
+    """
+    Instantiate a recall model from CPSC fields.
+    
+    _parse_cpsc_recall replaces nulls with defaults and converts counts and dates,
+    so validation is skipped unless CPSC_STRICT_PARSE is enabled.
+    """
+    if settings.CPSC_STRICT_PARSE:
+        return model(**fields)
+    return model.model_construct(**fields)
 
 
+def _copy_recalls(recalls: List[Recall]) -> List[Recall]:
+    """Deep copies of cached recalls, so callers can't modify the cached objects."""
+    return [recall.model_copy(deep=True) for recall in recalls]
 
-CPSC API Integration
-====================
-Service for fetching recalls from the Consumer Product Safety Commission API.
-https://www.saferproducts.gov/RestWebServices
-"""
 
-import httpx
-from typing import List, Optional
-from datetime import datetime, timedelta
-import logging
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a failed request is worth retrying (network errors and 5xx responses)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
 
-from app.config import settings
-from app.models.recall import Recall, RecallImage, RecallProduct, RecallHazard, RecallRemedy
-from app.skills.risk_classifier import classify_recall
 
-logger = logging.getLogger(__name__)
+class CPSCUnavailableError(Exception):
+    """Raised without a request while the circuit breaker is open."""
 
 
 class CPSCApiClient:
@@ -518,10 +105,31 @@ class CPSCApiClient:
     BASE_URL = "https://www.saferproducts.gov/RestWebServices"
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=60.0,
+            ),
+            headers={"User-Agent": "altitude/0.1"},
+        )
+        # (params, limit) -> (fetched_at, recalls, etag, last_modified)
+        self._cache: Dict[tuple, Tuple[float, List[Recall], Optional[str], Optional[str]]] = {}
+        # (params, limit) -> pending result, so concurrent identical queries share one request
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # classification inputs -> (risk_level, risk_score), valid for the risk rules fingerprinted below
+        self._classify_cache: OrderedDict = OrderedDict()
+        self._risk_config_fingerprint: Optional[bytes] = None
+        self._risk_config_checked_at = 0.0
+        self._fail_count = 0
+        self._circuit_open_until = 0.0
     
     async def close(self):
-        """Close the HTTP client."""
+        """Close the HTTP client and drop cached results."""
+        self._cache.clear()
+        self._classify_cache.clear()
         await self.client.aclose()
     
     async def fetch_recalls(
@@ -529,46 +137,40 @@ class CPSCApiClient:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         product_type: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        window_days: Optional[int] = None
     ) -> List[Recall]:
         """
         Fetch recalls from the CPSC API.
         
         Args:
             start_date: Filter recalls from this date
-            end_date: Filter recalls until this date
+            end_date: Filter recalls until this date (defaults to today)
             product_type: Filter by product type
             limit: Maximum number of recalls to return
+            window_days: If set, split the date range into windows of this many days
+                and fetch them in parallel (newest window first in the result)
         
         Returns:
             List of parsed Recall objects
         """
-        params = {
-            "format": "json",
-            "RecallDateStart": (start_date or datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d"),
-        }
-        
-        if end_date:
-            params["RecallDateEnd"] = end_date.strftime("%Y-%m-%d")
+        now = datetime.now()
+        start = start_date or now - timedelta(days=365)
+        end = end_date or now
         
-        if product_type:
-            params["ProductType"] = product_type
+        extra = {"ProductType": product_type} if product_type else {}
         
         try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params=params
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
+            if window_days:
+                recalls = await self._query_windows(start, end, window_days, extra, limit)
+            else:
+                # Always bound the range so the server doesn't return everything since start
+                params = {
+                    "RecallDateStart": start.strftime("%Y-%m-%d"),
+                    "RecallDateEnd": end.strftime("%Y-%m-%d"),
+                    **extra,
+                }
+                recalls = await self._query(params, limit)
             
             logger.info(f"Fetched {len(recalls)} recalls from CPSC API")
             return recalls
@@ -592,26 +194,7 @@ class CPSCApiClient:
             List of matching recalls
         """
         try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallTitle": query
-                }
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
-            
-            return recalls
-            
+            return await self._query({"RecallTitle": query}, limit)
         except Exception as e:
             logger.error(f"CPSC search error: {e}")
             return []
@@ -627,365 +210,318 @@ class CPSCApiClient:
             Recall object if found, None otherwise
         """
         try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallNumber": recall_number
-                }
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            if data:
-                recall = self._parse_cpsc_recall(data[0])
-                if recall:
-                    return await classify_recall(recall)
-            
-            return None
-            
+            recalls = await self._query({"RecallNumber": recall_number}, 1)
+            return recalls[0] if recalls else None
         except Exception as e:
             logger.error(f"Error fetching recall {recall_number}: {e}")
             return None
     
-    def _parse_cpsc_recall(self, data: dict) -> Optional[Recall]:
-        """Parse a CPSC API response into a Recall model."""
-        try:
-            recall_number = data.get("RecallNumber", "")
-            recall_id = f"cpsc-{recall_number}"
-            
-            # Parse products
-            products = []
-            for p in data.get("Products", []):
-                products.append(RecallProduct(
-                    name=p.get("Name", "Unknown"),
-                    description=p.get("Description", ""),
-                    model_number=p.get("Model", ""),
-                    manufacturer=data.get("Manufacturers", [{}])[0].get("Name", "") if data.get("Manufacturers") else ""
-                ))
-            
-            # Parse images
-            images = []
-            for img in data.get("Images", []):
-                url = img.get("URL", "")
-                if url:
-                    images.append(RecallImage(url=url))
-            
-            # Parse hazards
-            hazards = []
-            for h in data.get("Hazards", []):
-                hazards.append(RecallHazard(
-                    description=h.get("Name", ""),
-                    hazard_type=h.get("HazardType", "")
-                ))
-            
-            # Parse remedies
-            remedies = []
-            for r in data.get("Remedies", []):
-                remedies.append(RecallRemedy(
-                    description=r.get("Name", "")
-                ))
-            
-            # Parse date
-            recall_date = datetime.now()
-            date_str = data.get("RecallDate", "")
-            if date_str:
-                try:
-                    recall_date = datetime.strptime(date_str, "%Y-%m-%d")
-                except:
-                    pass
-            
-            # Parse units
-            units_str = data.get("NumberOfUnits", "0")
-            units = 0
-            if units_str:
-                try:
-                    units = int(str(units_str).replace(",", "").replace("About", "").strip())
-                except:
-                    pass
-            
-            return Recall(
-                recall_id=recall_id,
-                recall_number=recall_number,
-                title=data.get("Title", f"Recall {recall_number}"),
-                description=data.get("Description", ""),
-                recall_date=recall_date,
-                units_sold=units,
-                injuries=self._safe_int(data.get("Injuries")),
-                deaths=self._safe_int(data.get("Deaths")),
-                incidents=self._safe_int(data.get("Incidents")),
-                products=products,
-                images=images,
-                hazards=hazards,
-                remedies=remedies,
-                source="CPSC",
-                source_url=data.get("URL", "")
-            )
-            
-        except Exception as e:
-            logger.error(f"Error parsing CPSC recall: {e}")
-            return None
-    
-    def _safe_int(self, value) -> int:
-        """Safely convert a value to int."""
-        if value is None:
-            return 0
-        try:
-            return int(str(value).replace(",", ""))
-        except:
-            return 0
-
-
-# Singleton instance
-cpsc_client = CPSCApiClient()
-
-
-
-CPSC API Integration
-====================
-Service for fetching recalls from the Consumer Product Safety Commission API.
-https://www.saferproducts.gov/RestWebServices
-"""
-
-import httpx
-from typing import List, Optional
-from datetime import datetime, timedelta
-import logging
-
-from app.config import settings
-from app.models.recall import Recall, RecallImage, RecallProduct, RecallHazard, RecallRemedy
-from app.skills.risk_classifier import classify_recall
-
-logger = logging.getLogger(__name__)
-
-
-class CPSCApiClient:
-    """Client for the CPSC REST API."""
-    
-    BASE_URL = "https://www.saferproducts.gov/RestWebServices"
-    
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
-    
-    async def fetch_recalls(
+    async def _query_windows(
         self,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
-        product_type: Optional[str] = None,
-        limit: int = 100
+        start: datetime,
+        end: datetime,
+        window_days: int,
+        extra: dict,
+        limit: int
     ) -> List[Recall]:
+        """Fetch [start, end] as parallel, non-overlapping date windows and merge them newest first."""
+        windows = []
+        window_start = start
+        while window_start <= end:
+            window_end = min(window_start + timedelta(days=window_days - 1), end)
+            windows.append({
+                "RecallDateStart": window_start.strftime("%Y-%m-%d"),
+                "RecallDateEnd": window_end.strftime("%Y-%m-%d"),
+                **extra,
+            })
+            window_start = window_end + timedelta(days=1)
+        
+        pages = await asyncio.gather(*(self._query(params, None) for params in reversed(windows)))
+        recalls = []
+        seen = set()
+        for page in pages:
+            for recall in page:
+                if recall.recall_id not in seen:
+                    seen.add(recall.recall_id)
+                    recalls.append(recall)
+        return recalls[:limit]
+    
+    async def _query(self, params: dict, limit: Optional[int]) -> List[Recall]:
         """
-        Fetch recalls from the CPSC API.
-        
-        Args:
-            start_date: Filter recalls from this date
-            end_date: Filter recalls until this date
-            product_type: Filter by product type
-            limit: Maximum number of recalls to return
+        Fetch, parse and classify recalls matching the given filter params.
         
-        Returns:
-            List of parsed Recall objects
+        Results are cached per (params, limit) for _CACHE_TTL_SECONDS. Stale entries
+        are revalidated with If-None-Match/If-Modified-Since and reused on a 304.
+        Concurrent callers with the same key wait on a single in-flight request.
+        Every caller gets its own copies, so editing a result never touches the cache.
         """
-        params = {
-            "format": "json",
-            "RecallDateStart": (start_date or datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d"),
-        }
-        
-        if end_date:
-            params["RecallDateEnd"] = end_date.strftime("%Y-%m-%d")
-        
-        if product_type:
-            params["ProductType"] = product_type
-        
+        await self._sync_risk_config()
+        params = {"format": "json", **params}
+        key = (tuple(sorted(params.items())), limit)
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < _CACHE_TTL_SECONDS:
+            return _copy_recalls(cached[1])
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return _copy_recalls(await inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
         try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params=params
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
-            
-            logger.info(f"Fetched {len(recalls)} recalls from CPSC API")
-            return recalls
-            
-        except httpx.HTTPError as e:
-            logger.error(f"CPSC API error: {e}")
-            return []
+            recalls = await self._fetch(key, params, limit, cached)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
         except Exception as e:
-            logger.error(f"Error parsing CPSC data: {e}")
-            return []
-    
-    async def search_recalls(self, query: str, limit: int = 50) -> List[Recall]:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters (if any) still receive it
+            raise
+        else:
+            future.set_result(recalls)
+        finally:
+            del self._inflight[key]
+        return _copy_recalls(recalls)
+    
+    async def _fetch(
+        self,
+        key: tuple,
+        params: dict,
+        limit: Optional[int],
+        cached: Optional[Tuple[float, List[Recall], Optional[str], Optional[str]]]
+    ) -> List[Recall]:
+        """Request a page from the API (revalidating a stale cache entry), parse, classify and cache it."""
+        headers = {}
+        if cached:
+            _, _, etag, last_modified = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        response = await self._get(params, headers)
+        if cached and response.status_code == 304:
+            self._cache[key] = (time.monotonic(), *cached[1:])
+            return cached[1]
+        response.raise_for_status()
+        
+        # The Recall endpoint has no count/top parameter, so trim the decoded page
+        # in place before any per-record parsing and free the rest immediately
+        items = orjson.loads(response.content)
+        if limit is not None:
+            del items[limit:]
+        if len(items) >= _PARSE_IN_THREAD_MIN:
+            parsed = await asyncio.to_thread(self._parse_batch, items)
+        else:
+            parsed = self._parse_batch(items)
+        recalls = await self._classify_all(parsed)
+        
+        if key not in self._cache and len(self._cache) >= _CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts preserve insertion order)
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (
+            time.monotonic(),
+            recalls,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        return recalls
+    
+    async def _get(self, params: dict, headers: dict) -> httpx.Response:
         """
-        Search recalls by keyword.
-        
-        Args:
-            query: Search query
-            limit: Maximum results
+        GET the Recall endpoint, retrying transient failures with exponential backoff.
         
-        Returns:
-            List of matching recalls
+        After _CIRCUIT_FAILURE_THRESHOLD consecutive failures, requests are refused
+        with CPSCUnavailableError for _CIRCUIT_COOLDOWN_SECONDS.
         """
+        if time.monotonic() < self._circuit_open_until:
+            raise CPSCUnavailableError("CPSC API circuit open after repeated failures")
         try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallTitle": query
-                }
-            )
+            response = await self._get_with_retry(params, headers)
+        except httpx.HTTPError:
+            self._fail_count += 1
+            if self._fail_count >= _CIRCUIT_FAILURE_THRESHOLD:
+                logger.warning(
+                    f"CPSC API failed {self._fail_count} times in a row; "
+                    f"pausing requests for {_CIRCUIT_COOLDOWN_SECONDS}s"
+                )
+                self._circuit_open_until = time.monotonic() + _CIRCUIT_COOLDOWN_SECONDS
+                self._fail_count = 0
+            raise
+        self._fail_count = 0
+        return response
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=8),
+        retry=retry_if_exception(_is_transient),
+        reraise=True,
+    )
+    async def _get_with_retry(self, params: dict, headers: dict) -> httpx.Response:
+        response = await self.client.get(f"{self.BASE_URL}/Recall", params=params, headers=headers)
+        if response.status_code >= 500:
             response.raise_for_status()
-            
-            data = response.json()
-            recalls = []
-            
-            for item in data[:limit]:
-                recall = self._parse_cpsc_recall(item)
-                if recall:
-                    recall = await classify_recall(recall)
-                    recalls.append(recall)
-            
-            return recalls
-            
-        except Exception as e:
-            logger.error(f"CPSC search error: {e}")
-            return []
+        return response
     
-    async def get_recall_by_number(self, recall_number: str) -> Optional[Recall]:
+    def _parse_batch(self, items: list) -> List[Recall]:
         """
-        Get a specific recall by its number.
+        Parse a page of raw CPSC records, dropping any that fail to parse.
+        Pure, so it can run off the event loop.
+        """
+        now = datetime.now()
+        parsed = (self._parse_cpsc_recall(item, now) for item in items if item)
+        return [r for r in parsed if r is not None]
+    
+    async def _sync_risk_config(self) -> None:
+        """
+        Drop cached classifications, and the cached pages holding them, when the risk rules change.
+        Checked at most every _RISK_CONFIG_CHECK_SECONDS so cache hits don't pay for it.
+        """
+        now = time.monotonic()
+        if now - self._risk_config_checked_at < _RISK_CONFIG_CHECK_SECONDS:
+            return
+        self._risk_config_checked_at = now
+        fingerprint = await get_risk_classification_fingerprint()
+        if fingerprint != self._risk_config_fingerprint:
+            if self._risk_config_fingerprint is not None:
+                self._classify_cache.clear()
+                self._cache.clear()
+            self._risk_config_fingerprint = fingerprint
+    
+    async def _classify_all(self, parsed: List[Recall]) -> List[Recall]:
+        """Classify parsed recalls concurrently."""
+        sem = asyncio.Semaphore(_CLASSIFY_CONCURRENCY)
+        
+        async def _classify(recall: Recall) -> Recall:
+            # Key on every classifier input so an edited recall is re-classified
+            key = (
+                recall.recall_id,
+                recall.title,
+                recall.source_url,
+                recall.units_sold,
+                recall.injuries,
+                recall.deaths,
+                recall.incidents,
+                tuple(h.description for h in recall.hazards),
+            )
+            cached = self._classify_cache.get(key)
+            if cached is not None:
+                self._classify_cache.move_to_end(key)
+                recall.risk_level, recall.risk_score = cached
+                return recall
+            
+            async with sem:
+                recall = await classify_recall(recall)
+            self._classify_cache[key] = (recall.risk_level, recall.risk_score)
+            if len(self._classify_cache) > _CLASSIFY_CACHE_MAX_ENTRIES:
+                self._classify_cache.popitem(last=False)
+            return recall
+        
+        return list(await asyncio.gather(*(_classify(r) for r in parsed)))
+    
+    def _parse_cpsc_recall(self, data: dict, now: Optional[datetime] = None) -> Optional[Recall]:
+        """
+        Parse a CPSC API response into a Recall model.
         
         Args:
-            recall_number: The CPSC recall number
-        
-        Returns:
-            Recall object if found, None otherwise
+            data: Raw recall record from the API
+            now: Fallback recall date, shared across a batch to avoid a clock read per record
         """
         try:
-            response = await self.client.get(
-                f"{self.BASE_URL}/Recall",
-                params={
-                    "format": "json",
-                    "RecallNumber": recall_number
-                }
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            if data:
-                recall = self._parse_cpsc_recall(data[0])
-                if recall:
-                    return await classify_recall(recall)
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error fetching recall {recall_number}: {e}")
-            return None
-    
-    def _parse_cpsc_recall(self, data: dict) -> Optional[Recall]:
-        """Parse a CPSC API response into a Recall model."""
-        try:
-            recall_number = data.get("RecallNumber", "")
+            get = data.get
+            recall_number = get("RecallNumber") or ""
             recall_id = f"cpsc-{recall_number}"
             
-            # Parse products
-            products = []
-            for p in data.get("Products", []):
-                products.append(RecallProduct(
-                    name=p.get("Name", "Unknown"),
-                    description=p.get("Description", ""),
-                    model_number=p.get("Model", ""),
-                    manufacturer=data.get("Manufacturers", [{}])[0].get("Name", "") if data.get("Manufacturers") else ""
-                ))
+            # Parse products (manufacturer is per-recall, so look it up once)
+            manufacturers = get("Manufacturers") or [{}]
+            manufacturer = (manufacturers[0] or {}).get("Name") or ""
+            products = [
+                _build(
+                    RecallProduct,
+                    name=p.get("Name") or "Unknown",
+                    description=p.get("Description") or "",
+                    model_number=p.get("Model") or "",
+                    manufacturer=manufacturer
+                )
+                for p in get("Products") or []
+            ]
             
             # Parse images
-            images = []
-            for img in data.get("Images", []):
-                url = img.get("URL", "")
-                if url:
-                    images.append(RecallImage(url=url))
+            images = [
+                _build(RecallImage, url=url)
+                for url in (img.get("URL") for img in get("Images") or [])
+                if url
+            ]
             
             # Parse hazards
-            hazards = []
-            for h in data.get("Hazards", []):
-                hazards.append(RecallHazard(
-                    description=h.get("Name", ""),
-                    hazard_type=h.get("HazardType", "")
-                ))
+            hazards = [
+                _build(
+                    RecallHazard,
+                    description=h.get("Name") or "",
+                    hazard_type=h.get("HazardType") or ""
+                )
+                for h in get("Hazards") or []
+            ]
             
             # Parse remedies
-            remedies = []
-            for r in data.get("Remedies", []):
-                remedies.append(RecallRemedy(
-                    description=r.get("Name", "")
-                ))
+            remedies = [
+                _build(RecallRemedy, description=r.get("Name") or "")
+                for r in get("Remedies") or []
+            ]
             
             # Parse date
-            recall_date = datetime.now()
-            date_str = data.get("RecallDate", "")
+            recall_date = now or datetime.now()
+            date_str = get("RecallDate")
             if date_str:
                 try:
-                    recall_date = datetime.strptime(date_str, "%Y-%m-%d")
-                except:
+                    # API dates look like "2024-01-18T00:00:00"; only the date part is used
+                    recall_date = datetime.fromisoformat(date_str[:10])
+                except (ValueError, TypeError):
                     pass
             
-            # Parse units
-            units_str = data.get("NumberOfUnits", "0")
-            units = 0
-            if units_str:
-                try:
-                    units = int(str(units_str).replace(",", "").replace("About", "").strip())
-                except:
-                    pass
+            # Parse units ("About 1,200" etc. -> first integer run)
+            units = parse_cpsc_count(get("NumberOfUnits"))
             
-            return Recall(
+            return _build(
+                Recall,
                 recall_id=recall_id,
                 recall_number=recall_number,
-                title=data.get("Title", f"Recall {recall_number}"),
-                description=data.get("Description", ""),
+                title=get("Title") or f"Recall {recall_number}",
+                description=get("Description") or "",
                 recall_date=recall_date,
                 units_sold=units,
-                injuries=self._safe_int(data.get("Injuries")),
-                deaths=self._safe_int(data.get("Deaths")),
-                incidents=self._safe_int(data.get("Incidents")),
+                injuries=parse_cpsc_count(get("Injuries")),
+                deaths=parse_cpsc_count(get("Deaths")),
+                incidents=parse_cpsc_count(get("Incidents")),
                 products=products,
                 images=images,
                 hazards=hazards,
                 remedies=remedies,
                 source="CPSC",
-                source_url=data.get("URL", "")
+                source_url=get("URL") or ""
             )
             
-        except Exception as e:
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+            # Malformed record (e.g. a section that isn't a list of objects)
             logger.error(f"Error parsing CPSC recall: {e}")
             return None
-    
-    def _safe_int(self, value) -> int:
-        """Safely convert a value to int."""
-        if value is None:
-            return 0
-        try:
-            return int(str(value).replace(",", ""))
-        except:
-            return 0
 
 
-# Singleton instance
-cpsc_client = CPSCApiClient()
+# Singleton instance, created on first use so no HTTP client is built at import time
+cpsc_client: Optional[CPSCApiClient] = None
 
 
+def get_cpsc_client() -> CPSCApiClient:
+    """Return the shared CPSC client, creating it on first use."""
+    global cpsc_client
+    if cpsc_client is None:
+        cpsc_client = CPSCApiClient()
+    return cpsc_client
 
 
+async def close_cpsc_client() -> None:
+    """Close the shared CPSC client if it was created (called on application shutdown)."""
+    global cpsc_client
+    if cpsc_client is not None:
+        await cpsc_client.close()
+        cpsc_client = None
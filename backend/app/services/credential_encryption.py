@@ -6,75 +6,201 @@ Handles encryption/decryption of sensitive credentials like portal passwords.
 
 import os
 import base64
-from cryptography.fernet import Fernet
-from typing import Dict, Optional
+import json
+import logging
+import threading
+import time
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+logger = logging.getLogger(__name__)
+
+# Key under which encrypt_credentials stores the whole dict as a single token.
+# Dicts without it are the legacy format (one token per field).
+BLOB_KEY = "_encrypted"
+
+# New values are AES-GCM tokens: urlsafe_b64(version byte + 12-byte nonce + ciphertext/tag).
+# Their first base64 character is always "A"; Fernet tokens start with "gAAAAA" and legacy
+# base64-wrapped Fernet tokens with "Z0FB", so the three formats can't be confused.
+_AEAD_VERSION = b"\x02"
+_AEAD_PREFIX = b"A"
+_NONCE_SIZE = 12
+_FERNET_PREFIX = b"gAAAAA"
+
+# Decrypted values are kept in memory (never on disk) briefly, keyed by ciphertext
+_DECRYPT_CACHE_TTL_SECONDS = 300
+_DECRYPT_CACHE_MAX_ENTRIES = 1024
+
+
+def check_encryption_key_configured() -> None:
+    """Raise if production is running without CREDENTIAL_ENCRYPTION_KEY.
+
+    Called at startup so a misconfigured deploy fails before serving traffic
+    rather than on the first credential read.
+    """
+    # An ephemeral key makes every stored credential undecryptable after a restart
+    if os.getenv("ENVIRONMENT") == "production" and not os.getenv("CREDENTIAL_ENCRYPTION_KEY"):
+        raise RuntimeError("CREDENTIAL_ENCRYPTION_KEY must be set in production")
 
 
 class CredentialEncryption:
-    """Service for encrypting and decrypting credentials."""
+    """
+    Service for encrypting and decrypting credentials.
+    
+    Values are encrypted with AES-GCM; Fernet is kept to read tokens written
+    before the switch. Both ciphers (and the cryptography import) are built on
+    first use, so processes that never touch credentials don't pay for them.
+    """
     
     def __init__(self):
+        # ciphertext -> (decrypted_at, plaintext), oldest first
+        self._decrypt_cache: Dict[Union[str, bytes], Tuple[float, str]] = {}
+        self._decrypt_cache_lock = threading.Lock()
+    
+    def clear_cache(self) -> None:
+        """Drop all cached plaintext (called when stored credentials change)."""
+        with self._decrypt_cache_lock:
+            self._decrypt_cache.clear()
+    
+    @cached_property
+    def _key(self) -> bytes:
+        """The configured Fernet-format key (32 url-safe base64 encoded bytes)."""
+        from cryptography.fernet import Fernet
+        
         # Get encryption key from environment or generate one
         key = os.getenv("CREDENTIAL_ENCRYPTION_KEY")
         if not key:
-            # In production, this should be set via environment variable
+            check_encryption_key_configured()
             # For development, generate a key (not secure for production!)
             key = Fernet.generate_key().decode()
-            print("WARNING: Using auto-generated encryption key. Set CREDENTIAL_ENCRYPTION_KEY env var for production!")
+            logger.warning("Using auto-generated encryption key. Set CREDENTIAL_ENCRYPTION_KEY env var for production!")
+        
+        return key.encode() if isinstance(key, str) else key
+    
+    @cached_property
+    def cipher(self) -> "Fernet":
+        """Fernet cipher, used only to decrypt legacy tokens."""
+        from cryptography.fernet import Fernet
         
-        if isinstance(key, str):
-            key = key.encode()
+        return Fernet(self._key)
+    
+    @cached_property
+    def _aead(self) -> "AESGCM":
+        """AES-256-GCM cipher keyed by HKDF over the configured key."""
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
         
-        self.cipher = Fernet(key)
+        aead_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"altitude-credential-encryption-aesgcm",
+        ).derive(base64.urlsafe_b64decode(self._key))
+        return AESGCM(aead_key)
+    
+    def _encrypt_token(self, plaintext: bytes) -> str:
+        """Encrypt bytes into a versioned AES-GCM token."""
+        nonce = os.urandom(_NONCE_SIZE)
+        sealed = self._aead.encrypt(nonce, plaintext, None)
+        return base64.urlsafe_b64encode(_AEAD_VERSION + nonce + sealed).decode('ascii')
     
     def encrypt_credentials(self, credentials: Dict[str, str]) -> Dict[str, str]:
-        """Encrypt credential values in a dictionary."""
-        encrypted = {}
-        for key, value in credentials.items():
-            if value:
-                encrypted_value = self.cipher.encrypt(value.encode())
-                encrypted[key] = base64.b64encode(encrypted_value).decode()
-            else:
-                encrypted[key] = value
-        return encrypted
+        """Encrypt a credentials dictionary as a single token stored under BLOB_KEY."""
+        payload = json.dumps(credentials).encode()
+        return {BLOB_KEY: self._encrypt_token(payload)}
     
     def decrypt_credentials(self, encrypted_credentials: Dict[str, str]) -> Dict[str, str]:
-        """Decrypt credential values in a dictionary."""
-        decrypted = {}
-        for key, value in encrypted_credentials.items():
-            if value:
-                try:
-                    encrypted_bytes = base64.b64decode(value.encode())
-                    decrypted_value = self.cipher.decrypt(encrypted_bytes)
-                    decrypted[key] = decrypted_value.decode()
-                except Exception as e:
-                    print(f"Error decrypting {key}: {e}")
-                    decrypted[key] = value  # Return as-is if decryption fails
-            else:
-                decrypted[key] = value
-        return decrypted
+        """Decrypt a credentials dictionary (single-token or legacy per-field format)."""
+        blob = encrypted_credentials.get(BLOB_KEY)
+        if blob and len(encrypted_credentials) == 1:
+            return json.loads(self._decrypt_cached(blob))
+        
+        return {
+            key: self._decrypt_field(key, value) if value else value
+            for key, value in encrypted_credentials.items()
+        }
+    
+    def _decrypt_field(self, key: str, value: str) -> str:
+        """Decrypt one legacy per-field value, returning it as-is if decryption fails."""
+        try:
+            return self._decrypt_cached(value)
+        except Exception as e:
+            logger.error(f"Error decrypting {key}: {e}")
+            return value
     
     def encrypt_string(self, value: str) -> str:
         """Encrypt a single string value."""
         if not value:
             return value
-        encrypted = self.cipher.encrypt(value.encode())
-        return base64.b64encode(encrypted).decode()
+        return self._encrypt_token(value.encode())
     
-    def decrypt_string(self, encrypted_value: str) -> str:
-        """Decrypt a single string value."""
+    def decrypt_string(self, encrypted_value: Union[str, bytes]) -> str:
+        """Decrypt a single string value (a stored token, as str or bytes)."""
         if not encrypted_value:
             return encrypted_value
         try:
-            encrypted_bytes = base64.b64decode(encrypted_value.encode())
-            return self.cipher.decrypt(encrypted_bytes).decode()
+            return self._decrypt_cached(encrypted_value)
         except Exception as e:
-            print(f"Error decrypting string: {e}")
+            logger.error(f"Error decrypting string: {e}")
             return encrypted_value
+    
+    def _decrypt_cached(self, value: Union[str, bytes]) -> str:
+        """Decrypt a token to text, reusing the result for _DECRYPT_CACHE_TTL_SECONDS."""
+        # bytearray tokens are unhashable; key the cache on an immutable copy
+        key = bytes(value) if isinstance(value, bytearray) else value
+        with self._decrypt_cache_lock:
+            self._evict_expired(time.monotonic())
+            cached = self._decrypt_cache.get(key)
+        if cached:
+            return cached[1]
+        
+        plaintext = self._decrypt_token(value).decode()
+        with self._decrypt_cache_lock:
+            # Re-insert at the end so the dict stays ordered by decrypt time
+            self._decrypt_cache.pop(key, None)
+            if len(self._decrypt_cache) >= _DECRYPT_CACHE_MAX_ENTRIES:
+                self._decrypt_cache.pop(next(iter(self._decrypt_cache)))
+            self._decrypt_cache[key] = (time.monotonic(), plaintext)
+        return plaintext
+    
+    def _evict_expired(self, now: float) -> None:
+        """Drop entries older than the TTL; they sit at the front of the cache. Caller holds the lock."""
+        cache = self._decrypt_cache
+        while cache:
+            oldest = next(iter(cache))
+            if now - cache[oldest][0] < _DECRYPT_CACHE_TTL_SECONDS:
+                break
+            del cache[oldest]
+    
+    def _decrypt_token(self, value: Union[str, bytes]) -> bytes:
+        """Decrypt a stored AES-GCM token, or a legacy (optionally base64-wrapped) Fernet token."""
+        # Tokens are base64, so ascii is enough (and cheaper than utf-8); bytes pass through
+        token = value if isinstance(value, (bytes, bytearray)) else value.encode('ascii')
+        if token.startswith(_AEAD_PREFIX):
+            raw = base64.urlsafe_b64decode(token)
+            if raw[:1] != _AEAD_VERSION:
+                raise ValueError("Unknown credential token version")
+            nonce = raw[1:1 + _NONCE_SIZE]
+            return self._aead.decrypt(nonce, raw[1 + _NONCE_SIZE:], None)
+        if not token.startswith(_FERNET_PREFIX):
+            token = base64.b64decode(token)
+        return self.cipher.decrypt(token)
 
 
 # Global instance
 credential_encryption = CredentialEncryption()
 
+# Bound methods of the global instance, so hot paths call them without an attribute lookup
+encrypt_credentials = credential_encryption.encrypt_credentials
+decrypt_credentials = credential_encryption.decrypt_credentials
+encrypt_string = credential_encryption.encrypt_string
+decrypt_string = credential_encryption.decrypt_string
+clear_decrypt_cache = credential_encryption.clear_cache
+
 
 
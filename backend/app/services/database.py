@@ -3,23 +3,33 @@ Database service using SQLite with SQLAlchemy.
 Replaces in-memory storage with persistent database.
 """
 
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
-import json
 import os
 from pathlib import Path
+from itertools import islice
 import uuid
 import asyncio
-
-from sqlalchemy import select, update, delete, func, or_
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import ijson
+import orjson
+from dateutil import parser as date_parser
+from pydantic_core import to_jsonable_python
+from sqlalchemy import select, insert, update, delete, func, or_, text, cast, case, bindparam, false, ColumnElement, JSON
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.models.recall import Recall, RecallImage, RecallProduct, RecallHazard, RecallRemedy, RiskLevel
 from app.models.product_ban import ProductBan, ProductBanImage, ProductBanProduct, ProductBanHazard, ProductBanRemedy, ProductBanCreate, BanType
 from app.models.marketplace import Marketplace, MarketplaceListing, DEFAULT_MARKETPLACES
-from app.models.agent import AgentConfig, SearchTask, ToolConfig, ToolType, LLMProvider, AgentSkill, SkillType
+from app.models.agent import AgentConfig, SearchTask, TaskStatus, ToolConfig, ToolType, LLMProvider, AgentSkill, SkillType
 from app.models.investigation import Investigation
 from app.models.investigation_listing import InvestigationListing
 from app.models.import_models import ImportHistory, ImportSource
@@ -28,7 +38,9 @@ from app.models.risk_classification import get_default_risk_classification_confi
 from app.skills.risk_classifier import classify_recall, classify_violation, classify_risk
 from app.config import settings
 
-from app.db.session import AsyncSessionLocal, init_database
+from app.services import cpsc_api
+from app.services.cache import cached, cache_get, cache_set, cache_delete, cache_delete_prefix
+from app.db.session import AsyncSessionLocal, init_database, PRODUCT_BAN_FTS_TABLE
 from app.db.models import (
     ProductBanDB, ProductBanProductDB, ProductBanHazardDB,
     ProductBanRemedyDB, ProductBanImageDB,
@@ -48,6 +60,72 @@ from app.db.converters import (
     organization_to_db, db_to_organization,
 )
 
+logger = logging.getLogger(__name__)
+
+# Query cache keys and lifetimes (see app.services.cache; no-op without REDIS_URL)
+_RISK_SUMMARY_CACHE_KEY = "risk_summary"
+_RISK_SUMMARY_CACHE_TTL = 60
+_MARKETPLACES_CACHE_KEY = "mp:all"
+_MARKETPLACE_CACHE_PREFIX = "mp:"
+_MARKETPLACE_CACHE_TTL = 3600
+_PRODUCT_BAN_CACHE_PREFIX = "vb:"
+_PRODUCT_BAN_CACHE_TTL = 300
+
+# Loader options for reading a product ban with all of its child collections, built once
+_FULL_PRODUCT_BAN_OPTIONS = (
+    selectinload(ProductBanDB.products),
+    selectinload(ProductBanDB.hazards),
+    selectinload(ProductBanDB.remedies),
+    selectinload(ProductBanDB.images),
+)
+
+# Single-row variant: the small child collections come back in the same LEFT OUTER JOIN
+# query; products stays selectin since it can be large and would multiply the joined rows
+_SINGLE_PRODUCT_BAN_OPTIONS = (
+    joinedload(ProductBanDB.hazards),
+    joinedload(ProductBanDB.remedies),
+    joinedload(ProductBanDB.images),
+    selectinload(ProductBanDB.products),
+)
+
+# Base SELECTs built once at import; each call only adds its filters (generatively) and
+# SQLAlchemy's compiled-statement cache takes care of the SQL text
+_PRODUCT_BAN_SELECT = select(ProductBanDB).options(*_FULL_PRODUCT_BAN_OPTIONS)
+_PRODUCT_BAN_NEWEST_SELECT = _PRODUCT_BAN_SELECT.order_by(ProductBanDB.created_at.desc())
+_SINGLE_PRODUCT_BAN_SELECT = select(ProductBanDB).options(*_SINGLE_PRODUCT_BAN_OPTIONS)
+_FTS_MATCH_SELECT = f"SELECT product_ban_id FROM {PRODUCT_BAN_FTS_TABLE} WHERE {PRODUCT_BAN_FTS_TABLE} MATCH :q"
+
+# Hot-path statements built once; SQLAlchemy's compiled cache is keyed on them
+_AGENT_CONFIG_SELECT = select(AgentConfigDB).where(AgentConfigDB.id == "default")
+_ALL_MARKETPLACES_SELECT = select(MarketplaceDB)
+
+# List reads select plain columns (labelled by attribute key) instead of ORM entities,
+# skipping identity-map hydration; rows go straight into model_construct-based converters
+_SEARCH_TASK_COLUMNS = tuple(getattr(SearchTaskDB, name) for name in SearchTask.model_fields)
+_IMPORT_HISTORY_COLUMNS = tuple(getattr(ImportHistoryDB, attr.key) for attr in sa_inspect(ImportHistoryDB).column_attrs)
+_ORGANIZATION_COLUMNS = tuple(getattr(OrganizationDB, attr.key) for attr in sa_inspect(OrganizationDB).column_attrs)
+_PENDING_TASKS_SELECT = select(*_SEARCH_TASK_COLUMNS).where(SearchTaskDB.status == TaskStatus.PENDING)
+_ORGANIZATION_SELECT = select(OrganizationDB).where(OrganizationDB.organization_id == bindparam("organization_id"))
+_NEWEST_ORGANIZATION_SELECT = select(OrganizationDB).order_by(OrganizationDB.created_at.desc()).limit(1)
+
+# Rows written per transaction by batched ingest paths using ingest_session()
+INGEST_COMMIT_EVERY = 500
+
+# session.info key collecting the product ban IDs written since the last _commit_product_ban_writes
+_WRITTEN_PRODUCT_BAN_IDS = "written_product_ban_ids"
+
+# Risk classifications run concurrently by add_violations_bulk
+_CLASSIFY_CONCURRENCY = 16
+
+# In-process agent config cache: (loaded_at monotonic time, config). Read on most agent
+# calls and rarely changed; update_agent_config refreshes it in this process
+_AGENT_CONFIG_TTL_SECONDS = 60
+_agent_config_cache: Optional[Tuple[float, AgentConfig]] = None
+_agent_config_lock = asyncio.Lock()
+
+# Child tables keyed by product_ban_id
+_PRODUCT_BAN_CHILD_MODELS = (ProductBanProductDB, ProductBanHazardDB, ProductBanRemedyDB, ProductBanImageDB)
+
 
 async def get_db_session() -> AsyncSession:
     """Get database session."""
@@ -55,6 +133,19 @@ async def get_db_session() -> AsyncSession:
         return session
 
 
+@asynccontextmanager
+async def _use_session(session: Optional[AsyncSession] = None):
+    """
+    Yield the caller's session (e.g. a request-scoped one from app.db.session.get_session),
+    or open a short-lived session when none is given.
+    """
+    if session is not None:
+        yield session
+    else:
+        async with AsyncSessionLocal() as own_session:
+            yield own_session
+
+
 async def init_db():
     """Initialize the database with default data."""
     # Initialize database tables
@@ -68,21 +159,18 @@ async def init_db():
             existing = result.scalar_one_or_none()
             
             if not existing:
-                # Create default marketplaces
-                for mp_data in DEFAULT_MARKETPLACES:
-                    marketplace = Marketplace(**mp_data)
-                    db_marketplace = marketplace_to_db(marketplace)
-                    session.add(db_marketplace)
+                # Create default marketplaces in one multi-row INSERT
+                rows = [_column_values(marketplace_to_db(Marketplace(**mp_data))) for mp_data in DEFAULT_MARKETPLACES]
+                await session.execute(insert(MarketplaceDB), rows)
                 
                 await session.commit()
-                print("Default marketplaces initialized")
+                logger.info("Default marketplaces initialized")
             
             # Initialize default agent config
-            result = await session.execute(select(AgentConfigDB).where(AgentConfigDB.id == "default"))
+            result = await session.execute(_AGENT_CONFIG_SELECT)
             existing_config = result.scalar_one_or_none()
             
             if not existing_config:
-                from app.models.agent import AgentConfig
                 agent_config = AgentConfig(
                     id="default",
                     llm_provider=LLMProvider.OPENAI,
@@ -108,14 +196,15 @@ async def init_db():
                 )
                 session.add(db_config)
                 await session.commit()
-                print("Default agent config initialized")
+                _set_agent_config_cache(None)
+                logger.info("Default agent config initialized")
             
             # Initialize default organization for local development
             if settings.DEBUG:
                 await ensure_default_organization(session)
         except Exception as e:
             await session.rollback()
-            print(f"Error initializing database: {e}")
+            logger.error(f"Error initializing database: {e}")
             raise
 
 
@@ -123,12 +212,7 @@ async def init_db():
 async def get_all_violations(limit: Optional[int] = None, offset: int = 0) -> List[ProductBan]:
     """Get all product bans (backward compatibility - function name kept for now)."""
     async with AsyncSessionLocal() as session:
-        query = select(ProductBanDB).options(
-            selectinload(ProductBanDB.products),
-            selectinload(ProductBanDB.hazards),
-            selectinload(ProductBanDB.remedies),
-            selectinload(ProductBanDB.images),
-        ).order_by(ProductBanDB.created_at.desc())
+        query = _PRODUCT_BAN_NEWEST_SELECT
         
         if limit:
             query = query.limit(limit).offset(offset)
@@ -138,23 +222,106 @@ async def get_all_violations(limit: Optional[int] = None, offset: int = 0) -> Li
         return [db_to_product_ban(v) for v in db_product_bans]
 
 
+async def get_all_violations_iter(batch_size: int = 200) -> AsyncIterator[ProductBan]:
+    """
+    Stream all product bans (newest first) without buffering the whole table.
+    
+    Rows and their child collections are fetched batch_size at a time.
+    """
+    async with AsyncSessionLocal() as session:
+        query = _PRODUCT_BAN_NEWEST_SELECT.execution_options(yield_per=batch_size)
+        result = await session.stream(query)
+        async for db_product_ban in result.scalars():
+            yield db_to_product_ban(db_product_ban)
+
+
+async def list_product_bans(
+    risk_level: Optional[RiskLevel] = None,
+    agency_name: Optional[str] = None,
+    country: Optional[str] = None,
+    ban_type: Optional[BanType] = None,
+    limit: int = 50,
+    offset: int = 0
+) -> List[ProductBan]:
+    """
+    Get one page of product bans matching the filters, newest ban date first, then highest risk score.
+    
+    Filtering, ordering and pagination run in SQL, so only the requested page is loaded.
+    """
+    conditions = []
+    if risk_level:
+        conditions.append(ProductBanDB.risk_level == risk_level)
+    if agency_name:
+        conditions.append(func.lower(ProductBanDB.agency_name) == agency_name.lower())
+    if country:
+        conditions.append(ProductBanDB.country == country)
+    if ban_type:
+        conditions.append(ProductBanDB.ban_type == ban_type)
+    
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            _PRODUCT_BAN_SELECT
+            .where(*conditions)
+            .order_by(ProductBanDB.ban_date.desc().nulls_last(), ProductBanDB.risk_score.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [db_to_product_ban(v) for v in result.scalars().all()]
+
+
 async def get_violation(violation_id: str) -> Optional[ProductBan]:
     """Get a specific product ban by ID (backward compatibility - function name kept for now)."""
+    cache_key = f"{_PRODUCT_BAN_CACHE_PREFIX}{violation_id}"
+    hit = await cache_get(cache_key)
+    if hit is not None:
+        return ProductBan.model_validate(hit)
+    
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(ProductBanDB).options(
-                selectinload(ProductBanDB.products),
-                selectinload(ProductBanDB.hazards),
-                selectinload(ProductBanDB.remedies),
-                selectinload(ProductBanDB.images),
-            ).where(ProductBanDB.product_ban_id == violation_id)
+            _SINGLE_PRODUCT_BAN_SELECT.where(ProductBanDB.product_ban_id == violation_id)
         )
-        db_product_ban = result.scalar_one_or_none()
+        db_product_ban = result.unique().scalar_one_or_none()
         if db_product_ban:
-            return db_to_product_ban(db_product_ban)
+            product_ban = db_to_product_ban(db_product_ban)
+            await cache_set(cache_key, product_ban.model_dump(mode="json"), _PRODUCT_BAN_CACHE_TTL)
+            return product_ban
         return None
 
 
+async def _invalidate_product_ban_cache(product_ban_id: Optional[str] = None) -> None:
+    """Drop cached reads affected by a product ban write (all bans if no ID is given)."""
+    if product_ban_id is None:
+        await cache_delete_prefix(_PRODUCT_BAN_CACHE_PREFIX)
+        await cache_delete(_RISK_SUMMARY_CACHE_KEY)
+    else:
+        await cache_delete(f"{_PRODUCT_BAN_CACHE_PREFIX}{product_ban_id}", _RISK_SUMMARY_CACHE_KEY)
+
+
+async def _search_product_ban_condition(session: AsyncSession, query: str) -> Optional[ColumnElement[bool]]:
+    """
+    Build a WHERE condition matching product bans through the SQLite full-text index.
+    
+    Matching IDs stay in SQL as an IN subquery rather than being bound one parameter
+    each. Returns None when the index can't answer the query (other databases, queries
+    shorter than a trigram, or the index is missing) so callers fall back to ILIKE.
+    """
+    if session.get_bind().dialect.name != "sqlite" or len(query) < 3:
+        return None
+    # Quote as a single FTS5 string so operators/punctuation in the query are literal
+    match = '"' + query.replace('"', '""') + '"'
+    # Probe one row first: detects a missing index and short-circuits queries with no matches
+    try:
+        first = (await session.execute(text(f"{_FTS_MATCH_SELECT} LIMIT 1"), {"q": match})).first()
+    except OperationalError:
+        await session.rollback()
+        return None
+    if first is None:
+        return false()
+    return ProductBanDB.product_ban_id.in_(
+        text(_FTS_MATCH_SELECT).bindparams(q=match).columns(ProductBanDB.product_ban_id)
+    )
+
+
 async def search_violations(
     query: str,
     risk_level: Optional[RiskLevel] = None,
@@ -163,24 +330,23 @@ async def search_violations(
 ) -> List[ProductBan]:
     """Search product bans by text query and optional filters (backward compatibility - function name kept for now)."""
     async with AsyncSessionLocal() as session:
-        stmt = select(ProductBanDB).options(
-            selectinload(ProductBanDB.products),
-            selectinload(ProductBanDB.hazards),
-            selectinload(ProductBanDB.remedies),
-            selectinload(ProductBanDB.images),
-        )
+        stmt = _PRODUCT_BAN_SELECT
         
         conditions = []
         query_lower = query.lower()
         
-        # Text search
-        conditions.append(
-            or_(
-                ProductBanDB.title.ilike(f"%{query}%"),
-                ProductBanDB.description.ilike(f"%{query}%"),
-                ProductBanDB.ban_number.ilike(f"%{query}%"),
+        # Text search: full-text index when available, else ILIKE + product post-filter below
+        fts_condition = await _search_product_ban_condition(session, query)
+        if fts_condition is not None:
+            conditions.append(fts_condition)
+        else:
+            conditions.append(
+                or_(
+                    ProductBanDB.title.ilike(f"%{query}%"),
+                    ProductBanDB.description.ilike(f"%{query}%"),
+                    ProductBanDB.ban_number.ilike(f"%{query}%"),
+                )
             )
-        )
         
         # Filters
         if risk_level:
@@ -197,114 +363,193 @@ async def search_violations(
         db_product_bans = result.scalars().all()
         
         product_bans = [db_to_product_ban(v) for v in db_product_bans]
+        if fts_condition is not None:
+            return product_bans
         
         # Additional product-based filtering
         filtered = []
         for product_ban in product_bans:
-            searchable = f"{product_ban.title} {product_ban.description or ''} {product_ban.ban_number}".lower()
+            parts = [product_ban.title, product_ban.description or "", product_ban.ban_number]
             for product in product_ban.products:
-                searchable += f" {product.name} {product.model_number or ''} {product.manufacturer or ''}".lower()
+                parts += (product.name, product.model_number or "", product.manufacturer or "")
             
-            if query_lower in searchable:
+            # One join and one lower() per ban instead of one per product
+            if query_lower in " ".join(parts).lower():
                 filtered.append(product_ban)
         
         return filtered
 
 
-async def add_violation(product_ban: ProductBan) -> ProductBan:
-    """Add a new product ban with auto-classification (backward compatibility - function name kept for now)."""
+def _column_values(db_obj) -> Dict[str, object]:
+    """
+    Column values explicitly set on a transient ORM object, keyed by attribute name
+    (unset columns keep their defaults).
+    """
+    state = db_obj.__dict__
+    return {attr.key: state[attr.key] for attr in sa_inspect(type(db_obj)).column_attrs if attr.key in state}
+
+
+def _dialect_insert(session: AsyncSession, model):
+    """INSERT construct with ON CONFLICT support for the session's dialect (SQLite or PostgreSQL)."""
+    return pg_insert(model) if session.get_bind().dialect.name == "postgresql" else sqlite_insert(model)
+
+
+def _json_merge(session: AsyncSession, existing, incoming):
+    """SQL expression merging two JSON objects key by key (incoming wins)."""
+    if session.get_bind().dialect.name == "postgresql":
+        return cast(cast(func.coalesce(existing, cast("{}", JSON)), JSONB).op("||")(cast(incoming, JSONB)), JSON)
+    return func.json_patch(func.coalesce(existing, "{}"), incoming)
+
+
+def _upsert(session: AsyncSession, model, row: Dict[str, object], index_elements: List[str], keep: tuple = ()):
+    """
+    Build a single INSERT ... ON CONFLICT DO UPDATE statement for SQLite or PostgreSQL.
+    
+    Columns in index_elements and keep are left untouched when the row already exists.
+    """
+    stmt = _dialect_insert(session, model).values(**row)
+    skip = set(index_elements) | set(keep)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={key: stmt.excluded[key] for key in row if key not in skip}
+    )
+
+
+async def _write_product_ban(session: AsyncSession, product_ban: ProductBan) -> ProductBan:
+    """Upsert a classified product ban and replace its child rows (the caller commits)."""
+    # Insert or update the product ban in one statement
+    row = _column_values(product_ban_to_db(product_ban))
+    row["updated_at"] = datetime.utcnow()
+    upsert = _upsert(session, ProductBanDB, row, ["product_ban_id"], keep=("created_at",))
+    created_at = (await session.execute(upsert.returning(ProductBanDB.created_at))).scalar_one()
+    session.info.setdefault(_WRITTEN_PRODUCT_BAN_IDS, set()).add(product_ban.product_ban_id)
+    
+    # Replace related objects rather than appending duplicates on re-ingest
+    for child_model in _PRODUCT_BAN_CHILD_MODELS:
+        await session.execute(
+            delete(child_model).where(child_model.product_ban_id == product_ban.product_ban_id)
+        )
+    
+    # Add related objects with one multi-row INSERT per child table
+    pb_id = product_ban.product_ban_id
+    child_rows = (
+        ("products", ProductBanProductDB, [_column_values(product_ban_product_to_db(p, pb_id)) for p in product_ban.products]),
+        ("hazards", ProductBanHazardDB, [_column_values(product_ban_hazard_to_db(h, pb_id)) for h in product_ban.hazards]),
+        ("remedies", ProductBanRemedyDB, [_column_values(product_ban_remedy_to_db(r, pb_id)) for r in product_ban.remedies]),
+        ("images", ProductBanImageDB, [_column_values(product_ban_image_to_db(i, pb_id)) for i in product_ban.images]),
+    )
+    for label, child_model, rows in child_rows:
+        if not rows:
+            continue
+        try:
+            await session.execute(insert(child_model), rows)
+        except Exception as e:
+            logger.error(f"Failed to add {label} for {pb_id}: {e}")
+            raise
+    
+    # Everything just written is already in memory; no need to read it back
+    return product_ban.model_copy(update={"created_at": created_at, "updated_at": row["updated_at"]})
+
+
+async def _invalidate_written_product_bans(session: AsyncSession) -> None:
+    """Drop cached reads for the product bans written through the session so far."""
+    written = session.info.pop(_WRITTEN_PRODUCT_BAN_IDS, None)
+    if written:
+        await cache_delete(*(f"{_PRODUCT_BAN_CACHE_PREFIX}{pb_id}" for pb_id in written), _RISK_SUMMARY_CACHE_KEY)
+
+
+async def _commit_product_ban_writes(session: AsyncSession) -> None:
+    """Commit the session, then drop cached reads for the product bans it wrote."""
+    await session.commit()
+    await _invalidate_written_product_bans(session)
+
+
+async def add_violation(product_ban: ProductBan, session: Optional[AsyncSession] = None) -> ProductBan:
+    """
+    Add a new product ban with auto-classification (backward compatibility - function name kept for now).
+    
+    Pass a session from ingest_session() to batch many writes into one transaction;
+    it commits on exit and then invalidates the cached reads for every ban written.
+    """
     # Auto-classify risk
     product_ban = await classify_violation(product_ban)  # TODO: Rename to classify_product_ban
     
+    if session is not None:
+        return await _write_product_ban(session, product_ban)
+    
     async with AsyncSessionLocal() as session:
         try:
-            # Check if product ban already exists
-            existing = await session.get(ProductBanDB, product_ban.product_ban_id)
-            if existing:
-                # Update existing
-                db_product_ban = product_ban_to_db(product_ban)
-                for key, value in db_product_ban.__dict__.items():
-                    if not key.startswith('_') and key != 'product_ban_id':
-                        setattr(existing, key, value)
-                existing.updated_at = datetime.utcnow()
-            else:
-                # Create new
-                db_product_ban = product_ban_to_db(product_ban)
-                session.add(db_product_ban)
-            
-            # Add related objects
-            try:
-                for product in product_ban.products:
-                    db_product = product_ban_product_to_db(product, product_ban.product_ban_id)
-                    session.add(db_product)
-            except Exception as e:
-                print(f"[ERROR] Failed to add products for {product_ban.product_ban_id}: {e}")
-                raise
-            
-            try:
-                for hazard in product_ban.hazards:
-                    db_hazard = product_ban_hazard_to_db(hazard, product_ban.product_ban_id)
-                    session.add(db_hazard)
-            except Exception as e:
-                print(f"[ERROR] Failed to add hazards for {product_ban.product_ban_id}: {e}")
-                raise
-            
-            try:
-                for remedy in product_ban.remedies:
-                    db_remedy = product_ban_remedy_to_db(remedy, product_ban.product_ban_id)
-                    session.add(db_remedy)
-            except Exception as e:
-                print(f"[ERROR] Failed to add remedies for {product_ban.product_ban_id}: {e}")
-                raise
-            
-            try:
-                for image in product_ban.images:
-                    db_image = product_ban_image_to_db(image, product_ban.product_ban_id)
-                    session.add(db_image)
-            except Exception as e:
-                print(f"[ERROR] Failed to add images for {product_ban.product_ban_id}: {e}")
-                raise
-            
-            await session.commit()
-            await session.refresh(db_product_ban if not existing else existing)
-            
-            return await get_violation(product_ban.product_ban_id)
+            saved = await _write_product_ban(session, product_ban)
+            await _commit_product_ban_writes(session)
+            return saved
         except Exception as e:
             await session.rollback()
-            import traceback
-            error_details = {
-                'product_ban_id': product_ban.product_ban_id,
-                'ban_number': product_ban.ban_number,
-                'error_type': type(e).__name__,
-                'error_message': str(e),
-                'traceback': traceback.format_exc()
-            }
-            print(f"[ERROR] Failed to add product ban {product_ban.product_ban_id}:")
-            print(f"[ERROR] Type: {error_details['error_type']}")
-            print(f"[ERROR] Message: {error_details['error_message']}")
-            print(f"[ERROR] Traceback:\n{error_details['traceback']}")
-            # Log product ban data for debugging (truncated)
-            print(f"[ERROR] Product ban data: product_ban_id={product_ban.product_ban_id}, title={product_ban.title[:50] if product_ban.title else None}")
-            print(f"[ERROR] Products: {len(product_ban.products)}, Hazards: {len(product_ban.hazards)}, Remedies: {len(product_ban.remedies)}, Images: {len(product_ban.images)}")
+            logger.exception(
+                f"Failed to add product ban {product_ban.product_ban_id} "
+                f"(ban_number={product_ban.ban_number}, products={len(product_ban.products)}, "
+                f"hazards={len(product_ban.hazards)}, remedies={len(product_ban.remedies)}, "
+                f"images={len(product_ban.images)})",
+                extra={"product_ban_id": product_ban.product_ban_id, "ban_number": product_ban.ban_number}
+            )
             raise
 
 
+async def add_violations_bulk(product_bans: List[ProductBan]) -> List[ProductBan]:
+    """
+    Classify and save many product bans.
+    
+    Classification runs concurrently (bounded by _CLASSIFY_CONCURRENCY) before any
+    database work; the writes then share one session, committing every
+    INGEST_COMMIT_EVERY rows.
+    """
+    semaphore = asyncio.Semaphore(_CLASSIFY_CONCURRENCY)
+    
+    async def classify(product_ban: ProductBan) -> ProductBan:
+        async with semaphore:
+            return await classify_violation(product_ban)
+    
+    classified = await asyncio.gather(*(classify(pb) for pb in product_bans))
+    
+    saved = []
+    async with ingest_session() as session:
+        for i, product_ban in enumerate(classified, 1):
+            saved.append(await _write_product_ban(session, product_ban))
+            if i % INGEST_COMMIT_EVERY == 0:
+                await _commit_product_ban_writes(session)
+    return saved
+
+
+@asynccontextmanager
+async def ingest_session():
+    """
+    Open one session for a batch of writes (e.g. add_violation(pb, session=s)).
+    
+    Commits whatever is still pending on exit and rolls back on error. Long
+    batches should commit periodically (see INGEST_COMMIT_EVERY). Cached reads for
+    the product bans written are invalidated after the final commit, including
+    those committed earlier with a plain session.commit().
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            # Also covers rows committed earlier in a batch that later failed
+            await _invalidate_written_product_bans(session)
+
+
 async def delete_violation(violation_id: str) -> bool:
     """Delete a violation and all associated data (products, hazards, remedies, images, listings)."""
-    from app.db.models import MarketplaceListingDB
-    
     async with AsyncSessionLocal() as session:
         try:
             # Get product ban with all relationships loaded
             db_product_ban = await session.get(
                 ProductBanDB,
                 violation_id,
-                options=[
-                    selectinload(ProductBanDB.products),
-                    selectinload(ProductBanDB.hazards),
-                    selectinload(ProductBanDB.remedies),
-                    selectinload(ProductBanDB.images),
-                ]
+                options=_FULL_PRODUCT_BAN_OPTIONS
             )
             
             if not db_product_ban:
@@ -322,46 +567,42 @@ async def delete_violation(violation_id: str) -> bool:
             await session.delete(db_product_ban)
             
             await session.commit()
+            await _invalidate_product_ban_cache(violation_id)
             return True
         except Exception as e:
             await session.rollback()
-            print(f"Error deleting violation: {e}")
+            logger.error(f"Error deleting violation: {e}")
             raise
 
 
 async def delete_all_violations() -> int:
     """Delete all violations and their associated data. Returns count of deleted violations."""
-    from app.db.models import MarketplaceListingDB
-    
     async with AsyncSessionLocal() as session:
         try:
-            # Get all product ban IDs
-            result = await session.execute(select(ProductBanDB.product_ban_id))
-            product_ban_ids = [row[0] for row in result.all()]
-            count = len(product_ban_ids)
+            count = (await session.execute(select(func.count(ProductBanDB.product_ban_id)))).scalar() or 0
             
             if count == 0:
                 return 0
             
-            # Delete all associated listings
-            listings_result = await session.execute(
-                select(MarketplaceListingDB).where(MarketplaceListingDB.product_ban_id.in_(product_ban_ids))
+            # Bulk DELETEs, children first: SQLite doesn't enforce ON DELETE CASCADE
+            # unless foreign_keys is on, and Core deletes skip the ORM cascades
+            linked_listings = select(MarketplaceListingDB.id).where(MarketplaceListingDB.product_ban_id.is_not(None))
+            await session.execute(
+                delete(InvestigationListingDB).where(InvestigationListingDB.listing_id.in_(linked_listings))
             )
-            listings = listings_result.scalars().all()
-            for listing in listings:
-                await session.delete(listing)
-            
-            # Delete all product bans (cascade will handle related data)
-            product_bans_result = await session.execute(select(ProductBanDB))
-            product_bans = product_bans_result.scalars().all()
-            for product_ban in product_bans:
-                await session.delete(product_ban)
+            await session.execute(
+                delete(MarketplaceListingDB).where(MarketplaceListingDB.product_ban_id.is_not(None))
+            )
+            for child in _PRODUCT_BAN_CHILD_MODELS:
+                await session.execute(delete(child))
+            await session.execute(delete(ProductBanDB))
             
             await session.commit()
+            await _invalidate_product_ban_cache()
             return count
         except Exception as e:
             await session.rollback()
-            print(f"Error deleting all violations: {e}")
+            logger.error(f"Error deleting all violations: {e}")
             raise
 
 
@@ -369,12 +610,7 @@ async def get_violations_by_agency(agency_name: str) -> List[ProductBan]:
     """Get all product bans from a specific agency (backward compatibility - function name kept for now)."""
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(ProductBanDB).options(
-                selectinload(ProductBanDB.products),
-                selectinload(ProductBanDB.hazards),
-                selectinload(ProductBanDB.remedies),
-                selectinload(ProductBanDB.images),
-            ).where(ProductBanDB.agency_name.ilike(f"%{agency_name}%"))
+            _PRODUCT_BAN_SELECT.where(ProductBanDB.agency_name.ilike(f"%{agency_name}%"))
         )
         db_product_bans = result.scalars().all()
         return [db_to_product_ban(v) for v in db_product_bans]
@@ -384,17 +620,13 @@ async def get_violations_by_risk(risk_level: RiskLevel) -> List[ProductBan]:
     """Get product bans filtered by risk level (backward compatibility - function name kept for now)."""
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(ProductBanDB).options(
-                selectinload(ProductBanDB.products),
-                selectinload(ProductBanDB.hazards),
-                selectinload(ProductBanDB.remedies),
-                selectinload(ProductBanDB.images),
-            ).where(ProductBanDB.risk_level == risk_level)
+            _PRODUCT_BAN_NEWEST_SELECT.where(ProductBanDB.risk_level == risk_level)
         )
         db_product_bans = result.scalars().all()
         return [db_to_product_ban(v) for v in db_product_bans]
 
 
+@cached(_RISK_SUMMARY_CACHE_KEY, ttl=_RISK_SUMMARY_CACHE_TTL)
 async def get_violations_risk_summary() -> Dict[str, int]:
     """Get count of product bans by risk level (backward compatibility - function name kept for now)."""
     async with AsyncSessionLocal() as session:
@@ -420,40 +652,56 @@ async def get_violations_risk_summary() -> Dict[str, int]:
 # Marketplace operations
 async def get_all_marketplaces() -> List[Marketplace]:
     """Get all configured marketplaces."""
+    hit = await cache_get(_MARKETPLACES_CACHE_KEY)
+    if hit is not None:
+        return [Marketplace.model_validate(mp) for mp in hit]
+    
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(MarketplaceDB))
+        result = await session.execute(_ALL_MARKETPLACES_SELECT)
         db_marketplaces = result.scalars().all()
-        return [db_to_marketplace(mp) for mp in db_marketplaces]
+        marketplaces = [db_to_marketplace(mp) for mp in db_marketplaces]
+    await cache_set(
+        _MARKETPLACES_CACHE_KEY,
+        [mp.model_dump(mode="json") for mp in marketplaces],
+        _MARKETPLACE_CACHE_TTL
+    )
+    return marketplaces
 
 
 async def get_marketplace(marketplace_id: str) -> Optional[Marketplace]:
     """Get a specific marketplace."""
+    cache_key = f"{_MARKETPLACE_CACHE_PREFIX}{marketplace_id}"
+    hit = await cache_get(cache_key)
+    if hit is not None:
+        return Marketplace.model_validate(hit)
+    
     async with AsyncSessionLocal() as session:
         db_marketplace = await session.get(MarketplaceDB, marketplace_id)
         if db_marketplace:
-            return db_to_marketplace(db_marketplace)
+            marketplace = db_to_marketplace(db_marketplace)
+            await cache_set(cache_key, marketplace.model_dump(mode="json"), _MARKETPLACE_CACHE_TTL)
+            return marketplace
         return None
 
 
+async def _invalidate_marketplace_cache(marketplace_id: str) -> None:
+    """Drop cached marketplace reads after a marketplace write."""
+    await cache_delete(f"{_MARKETPLACE_CACHE_PREFIX}{marketplace_id}", _MARKETPLACES_CACHE_KEY)
+
+
 async def save_marketplace(marketplace: Marketplace) -> Marketplace:
     """Save or update a marketplace."""
     async with AsyncSessionLocal() as session:
         try:
-            existing = await session.get(MarketplaceDB, marketplace.id)
-            if existing:
-                db_marketplace = marketplace_to_db(marketplace)
-                for key, value in db_marketplace.__dict__.items():
-                    if not key.startswith('_') and key != 'id':
-                        setattr(existing, key, value)
-                existing.updated_at = datetime.utcnow()
-                await session.commit()
-                return db_to_marketplace(existing)
-            else:
-                db_marketplace = marketplace_to_db(marketplace)
-                session.add(db_marketplace)
-                await session.commit()
-                await session.refresh(db_marketplace)
-                return db_to_marketplace(db_marketplace)
+            row = _column_values(marketplace_to_db(marketplace))
+            row["updated_at"] = datetime.utcnow()
+            upsert = _upsert(session, MarketplaceDB, row, ["id"], keep=("created_at",))
+            db_marketplace = (
+                await session.scalars(upsert.returning(MarketplaceDB), execution_options={"populate_existing": True})
+            ).one()
+            await session.commit()
+            await _invalidate_marketplace_cache(marketplace.id)
+            return db_to_marketplace(db_marketplace)
         except Exception as e:
             await session.rollback()
             raise
@@ -478,7 +726,7 @@ async def update_marketplace(marketplace_id: str, updates: dict) -> Optional[Mar
             db_marketplace.updated_at = datetime.utcnow()
             
             await session.commit()
-            await session.refresh(db_marketplace)
+            await _invalidate_marketplace_cache(marketplace_id)
             return db_to_marketplace(db_marketplace)
         except Exception as e:
             await session.rollback()
@@ -488,43 +736,60 @@ async def update_marketplace(marketplace_id: str, updates: dict) -> Optional[Mar
 # Listing operations
 async def save_listing(listing: MarketplaceListing) -> MarketplaceListing:
     """Save a marketplace listing (dedupes by listing_url)."""
+    return (await save_listings_bulk([listing]))[0]
+
+
+async def save_listings_bulk(listings: List[MarketplaceListing]) -> List[MarketplaceListing]:
+    """
+    Save many marketplace listings in one upsert (dedupes by listing_url).
+    
+    For a URL that is already stored, non-empty scraped fields overwrite the old
+    values, and the match (score, reasons and product ban) is only replaced by a
+    higher-scoring one. Returns the stored listings, one per distinct URL, in input order.
+    """
+    if not listings:
+        return []
+    
+    # A statement may touch each row only once: keep the best match per URL
+    by_url: Dict[str, MarketplaceListing] = {}
+    for listing in listings:
+        current = by_url.get(listing.listing_url)
+        if current is None or listing.match_score > current.match_score:
+            by_url[listing.listing_url] = listing
+    rows = [_column_values(marketplace_listing_to_db(listing)) for listing in by_url.values()]
+    
     async with AsyncSessionLocal() as session:
         try:
-            # Check for existing listing by URL
-            result = await session.execute(
-                select(MarketplaceListingDB).where(
-                    MarketplaceListingDB.listing_url == listing.listing_url
-                )
-            )
-            existing = result.scalar_one_or_none()
+            stmt = _dialect_insert(session, MarketplaceListingDB)
+            table = MarketplaceListingDB.__table__
+            new = stmt.excluded
             
-            if existing:
-                # Update existing
-                if listing.title:
-                    existing.title = listing.title
-                if listing.description:
-                    existing.description = listing.description
-                if listing.image_url:
-                    existing.image_url = listing.image_url
-                if listing.seller_name:
-                    existing.seller_name = listing.seller_name
-                if listing.price is not None:
-                    existing.price = listing.price
-                if listing.match_score > existing.match_score:
-                    existing.match_score = listing.match_score
-                    existing.match_reasons = listing.match_reasons
-                    existing.product_ban_id = listing.violation_id or listing.recall_id  # Support both old and new field names
-                existing.updated_at = datetime.utcnow()
-                await session.commit()
-                await session.refresh(existing)
-                return db_to_marketplace_listing(existing)
-            else:
-                # Create new
-                db_listing = marketplace_listing_to_db(listing)
-                session.add(db_listing)
-                await session.commit()
-                await session.refresh(db_listing)
-                return db_to_marketplace_listing(db_listing)
+            def keep_unless_empty(column):
+                return func.coalesce(func.nullif(new[column], ""), table.c[column])
+            
+            better_match = new.match_score > table.c.match_score
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["listing_url"],
+                set_={
+                    "title": keep_unless_empty("title"),
+                    "description": keep_unless_empty("description"),
+                    "image_url": keep_unless_empty("image_url"),
+                    "seller_name": keep_unless_empty("seller_name"),
+                    "price": func.coalesce(new.price, table.c.price),
+                    "match_score": case((better_match, new.match_score), else_=table.c.match_score),
+                    "match_reasons": case((better_match, new.match_reasons), else_=table.c.match_reasons),
+                    "product_ban_id": case((better_match, new.product_ban_id), else_=table.c.product_ban_id),
+                    "updated_at": datetime.utcnow(),
+                },
+            )
+            result = await session.scalars(
+                stmt.returning(MarketplaceListingDB, sort_by_parameter_order=True),
+                rows,
+                execution_options={"populate_existing": True}
+            )
+            saved = [db_to_marketplace_listing(db_listing) for db_listing in result]
+            await session.commit()
+            return saved
         except Exception as e:
             await session.rollback()
             raise
@@ -572,7 +837,6 @@ async def add_investigation(investigation: Investigation) -> Investigation:
             db_investigation = investigation_to_db(investigation)
             session.add(db_investigation)
             await session.commit()
-            await session.refresh(db_investigation)
             return db_to_investigation(db_investigation)
         except Exception as e:
             await session.rollback()
@@ -600,19 +864,21 @@ async def update_investigation(investigation: Investigation) -> Investigation:
     """Update an existing investigation."""
     async with AsyncSessionLocal() as session:
         try:
-            db_investigation = await session.get(InvestigationDB, investigation.investigation_id)
+            # Update mapped columns only, in one UPDATE ... RETURNING
+            values = _column_values(investigation_to_db(investigation))
+            values.pop("investigation_id", None)
+            values["updated_at"] = datetime.utcnow()
+            result = await session.execute(
+                update(InvestigationDB)
+                .where(InvestigationDB.investigation_id == investigation.investigation_id)
+                .values(**values)
+                .returning(InvestigationDB)
+            )
+            db_investigation = result.scalar_one_or_none()
             if not db_investigation:
                 raise ValueError(f"Investigation {investigation.investigation_id} not found")
             
-            # Update fields
-            updated_db = investigation_to_db(investigation)
-            for key, value in updated_db.__dict__.items():
-                if not key.startswith('_') and key != 'investigation_id':
-                    setattr(db_investigation, key, value)
-            
-            db_investigation.updated_at = datetime.utcnow()
             await session.commit()
-            await session.refresh(db_investigation)
             return db_to_investigation(db_investigation)
         except Exception as e:
             await session.rollback()
@@ -657,38 +923,32 @@ async def link_listing_to_investigation(
     """Create/update the join record linking an investigation to a listing."""
     async with AsyncSessionLocal() as session:
         try:
-            # Check if link already exists
-            result = await session.execute(
-                select(InvestigationListingDB).where(
-                    InvestigationListingDB.investigation_id == investigation_id,
-                    InvestigationListingDB.listing_id == listing_id
-                )
+            # Insert the link, or refresh it if it already exists, in one race-safe statement
+            stmt = _dialect_insert(session, InvestigationListingDB).values(
+                id=f"inv-list-{uuid.uuid4().hex[:12]}",
+                investigation_id=investigation_id,
+                listing_id=listing_id,
+                added_by=added_by,
+                source=source,
+                meta_data=metadata or {},
+                created_at=datetime.utcnow(),
+            )
+            table = InvestigationListingDB.__table__
+            set_ = {
+                "added_by": func.coalesce(stmt.excluded.added_by, table.c.added_by),
+                "source": func.coalesce(stmt.excluded.source, table.c.source),
+                "created_at": stmt.excluded.created_at,
+            }
+            if metadata:
+                set_["meta_data"] = _json_merge(session, table.c.meta_data, stmt.excluded.meta_data)
+            await session.execute(
+                stmt.on_conflict_do_update(index_elements=["investigation_id", "listing_id"], set_=set_)
             )
-            existing = result.scalar_one_or_none()
-            
-            if existing:
-                if added_by:
-                    existing.added_by = added_by
-                if source:
-                    existing.source = source
-                if metadata:
-                    existing.meta_data = {**(existing.meta_data or {}), **metadata}
-                existing.created_at = datetime.utcnow()
-            else:
-                db_link = InvestigationListingDB(
-                    id=f"inv-list-{uuid.uuid4().hex[:12]}",
-                    investigation_id=investigation_id,
-                    listing_id=listing_id,
-                    added_by=added_by,
-                    source=source,
-                    meta_data=metadata or {},
-                )
-                session.add(db_link)
-            
             await session.commit()
             
-            # Recalculate investigation counts
-            await recalculate_investigation_counts(investigation_id)
+            # SQLite keeps the counts up to date with triggers (see app.db.session)
+            if session.get_bind().dialect.name != "sqlite":
+                await recalculate_investigation_counts(investigation_id)
             
             # Return InvestigationListing model
             return InvestigationListing(
@@ -708,31 +968,58 @@ async def recalculate_investigation_counts(investigation_id: str) -> None:
     """Recalculate listings_found based on join records."""
     async with AsyncSessionLocal() as session:
         try:
-            result = await session.execute(
-                select(func.count(InvestigationListingDB.id)).where(
-                    InvestigationListingDB.investigation_id == investigation_id
-                )
+            # Single correlated UPDATE instead of count, load, then write
+            count = (
+                select(func.count(InvestigationListingDB.id))
+                .where(InvestigationListingDB.investigation_id == investigation_id)
+                .scalar_subquery()
             )
-            count = result.scalar() or 0
-            
-            db_investigation = await session.get(InvestigationDB, investigation_id)
-            if db_investigation:
-                db_investigation.listings_found = count
-                db_investigation.listings_queued = count
-                db_investigation.updated_at = datetime.utcnow()
-                await session.commit()
+            await session.execute(
+                update(InvestigationDB)
+                .where(InvestigationDB.investigation_id == investigation_id)
+                .values(listings_found=count, listings_queued=count, updated_at=datetime.utcnow())
+            )
+            await session.commit()
         except Exception as e:
             await session.rollback()
             raise
 
 
 # Agent config operations
-async def get_agent_config() -> AgentConfig:
-    """Get agent configuration."""
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(AgentConfigDB).where(AgentConfigDB.id == "default")
-        )
+def _cached_agent_config() -> Optional[AgentConfig]:
+    """Copy of the cached agent config if still fresh (callers may mutate what they get)."""
+    if _agent_config_cache is None:
+        return None
+    loaded_at, config = _agent_config_cache
+    if time.monotonic() - loaded_at >= _AGENT_CONFIG_TTL_SECONDS:
+        return None
+    return config.model_copy(deep=True)
+
+
+def _set_agent_config_cache(config: Optional[AgentConfig]) -> None:
+    global _agent_config_cache
+    _agent_config_cache = (time.monotonic(), config.model_copy(deep=True)) if config else None
+
+
+async def get_agent_config(session: Optional[AsyncSession] = None) -> AgentConfig:
+    """Get agent configuration (cached in-process for up to a minute)."""
+    config = _cached_agent_config()
+    if config is not None:
+        return config
+    
+    # One loader refreshes a cold cache; concurrent callers wait and reuse its result
+    async with _agent_config_lock:
+        config = _cached_agent_config()
+        if config is None:
+            config = await _load_agent_config(session)
+            _set_agent_config_cache(config)
+    return config
+
+
+async def _load_agent_config(session: Optional[AsyncSession] = None) -> AgentConfig:
+    """Read the agent configuration from the database."""
+    async with _use_session(session) as session:
+        result = await session.execute(_AGENT_CONFIG_SELECT)
         db_config = result.scalar_one_or_none()
         
         if db_config:
@@ -752,23 +1039,22 @@ async def update_agent_config(updates: dict) -> AgentConfig:
     """Update agent configuration."""
     async with AsyncSessionLocal() as session:
         try:
-            result = await session.execute(
-                select(AgentConfigDB).where(AgentConfigDB.id == "default")
-            )
+            result = await session.execute(_AGENT_CONFIG_SELECT)
             db_config = result.scalar_one_or_none()
             
             if db_config:
-                config_data = db_config.config_data
-                config = AgentConfig(**config_data)
-                
-                # Apply updates
-                for key, value in updates.items():
-                    if hasattr(config, key) and value is not None:
-                        setattr(config, key, value)
-                
-                config.updated_at = datetime.utcnow()
-                db_config.config_data = config.model_dump(mode='json')
-                db_config.updated_at = datetime.utcnow()
+                # Merge only the changed fields (JSON-encoded) into the stored config,
+                # then validate the result once
+                now = datetime.utcnow()
+                changes = {
+                    key: to_jsonable_python(value)
+                    for key, value in updates.items()
+                    if key in AgentConfig.model_fields and value is not None
+                }
+                merged = {**db_config.config_data, **changes, "updated_at": now.isoformat()}
+                config = AgentConfig.model_validate(merged)
+                db_config.config_data = merged
+                db_config.updated_at = now
             else:
                 # Create new config
                 config = AgentConfig(id="default", **updates)
@@ -779,8 +1065,8 @@ async def update_agent_config(updates: dict) -> AgentConfig:
                 session.add(db_config)
             
             await session.commit()
-            await session.refresh(db_config)
-            return AgentConfig(**db_config.config_data)
+            _set_agent_config_cache(config)
+            return config
         except Exception as e:
             await session.rollback()
             raise
@@ -791,52 +1077,37 @@ async def create_task(task: SearchTask) -> SearchTask:
     """Create a new task."""
     async with AsyncSessionLocal() as session:
         try:
-            db_task = SearchTaskDB(
-                id=task.id,
-                task_type=task.task_type,
-                status=task.status,
-                recall_id=task.recall_id,
-                violation_id=task.recall_id,  # Support both
-                marketplace_ids=task.marketplace_ids,
-                search_query=task.search_query,
-                result=task.result,
-                error_message=task.error_message,
-                progress=task.progress,
-                items_processed=task.items_processed,
-                items_total=task.items_total,
-                created_at=task.created_at,
-                started_at=task.started_at,
-                completed_at=task.completed_at,
+            await session.execute(
+                insert(SearchTaskDB).values(
+                    id=task.id,
+                    task_type=task.task_type,
+                    status=task.status,
+                    recall_id=task.recall_id,
+                    violation_id=task.recall_id,  # Support both
+                    marketplace_ids=task.marketplace_ids,
+                    search_query=task.search_query,
+                    result=task.result,
+                    error_message=task.error_message,
+                    progress=task.progress,
+                    items_processed=task.items_processed,
+                    items_total=task.items_total,
+                    created_at=task.created_at,
+                    started_at=task.started_at,
+                    completed_at=task.completed_at,
+                )
             )
-            session.add(db_task)
             await session.commit()
-            await session.refresh(db_task)
             
-            # Convert back to Pydantic model
-            return SearchTask(
-                id=db_task.id,
-                task_type=db_task.task_type,
-                status=db_task.status,
-                recall_id=db_task.recall_id,
-                marketplace_ids=db_task.marketplace_ids or [],
-                search_query=db_task.search_query,
-                result=db_task.result,
-                error_message=db_task.error_message,
-                progress=db_task.progress,
-                items_processed=db_task.items_processed,
-                items_total=db_task.items_total,
-                created_at=db_task.created_at,
-                started_at=db_task.started_at,
-                completed_at=db_task.completed_at,
-            )
+            # Every column came from the task itself
+            return task
         except Exception as e:
             await session.rollback()
             raise
 
 
-async def get_task(task_id: str) -> Optional[SearchTask]:
+async def get_task(task_id: str, session: Optional[AsyncSession] = None) -> Optional[SearchTask]:
     """Get a task by ID."""
-    async with AsyncSessionLocal() as session:
+    async with _use_session(session) as session:
         db_task = await session.get(SearchTaskDB, task_id)
         if db_task:
             return SearchTask(
@@ -858,33 +1129,18 @@ async def get_task(task_id: str) -> Optional[SearchTask]:
         return None
 
 
+def _search_task_from_row(row) -> SearchTask:
+    """Build a SearchTask from a search_tasks row mapping without re-validating it."""
+    values = dict(row)
+    values["marketplace_ids"] = values["marketplace_ids"] or []
+    return SearchTask.model_construct(**values)
+
+
 async def get_pending_tasks() -> List[SearchTask]:
     """Get all pending tasks."""
-    from app.models.agent import TaskStatus
     async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(SearchTaskDB).where(SearchTaskDB.status == TaskStatus.PENDING)
-        )
-        db_tasks = result.scalars().all()
-        return [
-            SearchTask(
-                id=t.id,
-                task_type=t.task_type,
-                status=t.status,
-                recall_id=t.recall_id,
-                marketplace_ids=t.marketplace_ids or [],
-                search_query=t.search_query,
-                result=t.result,
-                error_message=t.error_message,
-                progress=t.progress,
-                items_processed=t.items_processed,
-                items_total=t.items_total,
-                created_at=t.created_at,
-                started_at=t.started_at,
-                completed_at=t.completed_at,
-            )
-            for t in db_tasks
-        ]
+        result = await session.execute(_PENDING_TASKS_SELECT)
+        return [_search_task_from_row(row) for row in result.mappings().all()]
 
 
 # Import history operations
@@ -892,29 +1148,14 @@ async def save_import_history(history: ImportHistory) -> ImportHistory:
     """Save or update import history record."""
     async with AsyncSessionLocal() as session:
         try:
-            # Check if record exists
-            result = await session.execute(
-                select(ImportHistoryDB).where(ImportHistoryDB.import_id == history.import_id)
-            )
-            existing = result.scalar_one_or_none()
-            
-            if existing:
-                # Update existing record
-                db_history = import_history_to_db(history)
-                # Update all fields
-                for key, value in db_history.__dict__.items():
-                    if not key.startswith('_') and key != 'import_id':  # Don't update import_id
-                        setattr(existing, key, value)
-                await session.commit()
-                await session.refresh(existing)
-                return db_to_import_history(existing)
-            else:
-                # Insert new record
-                db_history = import_history_to_db(history)
-                session.add(db_history)
-                await session.commit()
-                await session.refresh(db_history)
-                return db_to_import_history(db_history)
+            # Insert or update in one statement
+            row = _column_values(import_history_to_db(history))
+            upsert = _upsert(session, ImportHistoryDB, row, ["import_id"])
+            db_history = (
+                await session.scalars(upsert.returning(ImportHistoryDB), execution_options={"populate_existing": True})
+            ).one()
+            await session.commit()
+            return db_to_import_history(db_history)
         except Exception as e:
             await session.rollback()
             raise
@@ -928,18 +1169,20 @@ async def get_import_history(
 ) -> List[ImportHistory]:
     """Get import history with optional filtering."""
     async with AsyncSessionLocal() as session:
-        query = select(ImportHistoryDB)
-    
-    if import_type:
-        query = query.where(ImportHistoryDB.import_type == import_type)
-    if source:
-        query = query.where(ImportHistoryDB.source == source)
-    
-    query = query.order_by(ImportHistoryDB.created_at.desc()).limit(limit).offset(offset)
-    
-    result = await session.execute(query)
-    db_histories = result.scalars().all()
-    return [db_to_import_history(h) for h in db_histories]
+        query = select(*_IMPORT_HISTORY_COLUMNS)
+        
+        if import_type:
+            query = query.where(ImportHistoryDB.import_type == import_type)
+        if source:
+            query = query.where(ImportHistoryDB.source == source)
+        
+        # With both filters set, ix_import_history_source_type_created_at yields the rows in
+        # created_at order (no sort step); the index doesn't cover the selected columns, so
+        # each page row is still read from the table
+        query = query.order_by(ImportHistoryDB.created_at.desc()).limit(limit).offset(offset)
+        
+        result = await session.execute(query)
+        return [db_to_import_history(row) for row in result.all()]
 
 
 async def get_import_history_item(import_id: str) -> Optional[ImportHistory]:
@@ -952,35 +1195,42 @@ async def get_import_history_item(import_id: str) -> Optional[ImportHistory]:
 
 
 # Backward compatibility - Recall operations (map to violations)
+def _construct_all(model, items) -> list:
+    """Copy already-validated sub-items into model without re-validating (fields model lacks are dropped)."""
+    fields = model.model_fields
+    return [
+        model.model_construct(**{k: v for k, v in item.__dict__.items() if k in fields})
+        for item in items
+    ]
+
+
+def _violation_to_recall(v: ProductBan) -> Recall:
+    """Convert a product ban to a Recall (in practice they are the same record)."""
+    # The product ban is validated already; model_construct skips a second pass
+    return Recall.model_construct(
+        recall_id=v.product_ban_id,
+        recall_number=v.ban_number,
+        title=v.title,
+        description=v.description or "",
+        recall_date=v.ban_date,
+        units_sold=v.units_affected,
+        injuries=v.injuries,
+        deaths=v.deaths,
+        incidents=v.incidents,
+        products=_construct_all(RecallProduct, v.products),
+        images=_construct_all(RecallImage, v.images),
+        hazards=_construct_all(RecallHazard, v.hazards),
+        remedies=_construct_all(RecallRemedy, v.remedies),
+        source=v.agency_name,
+        source_url=v.url,
+        risk_level=v.risk_level,
+        risk_score=v.risk_score,
+    )
+
+
 async def get_all_recalls() -> List[Recall]:
     """Get all recalls (backward compatibility - returns violations)."""
-    violations = await get_all_violations()
-    # Convert violations to recalls for backward compatibility
-    from app.models.recall import Recall
-    recalls = []
-    for v in violations:
-        # Simple conversion - in practice, product bans and recalls are the same
-        recall = Recall(
-            recall_id=v.product_ban_id,
-            recall_number=v.ban_number,
-            title=v.title,
-            description=v.description or "",
-            recall_date=v.ban_date,
-            units_sold=v.units_affected,
-            injuries=v.injuries,
-            deaths=v.deaths,
-            incidents=v.incidents,
-            products=[RecallProduct(**p.model_dump()) for p in v.products],
-            images=[RecallImage(**i.model_dump()) for i in v.images],
-            hazards=[RecallHazard(**h.model_dump()) for h in v.hazards],
-            remedies=[RecallRemedy(**r.model_dump()) for r in v.remedies],
-            source=v.agency_name,
-            source_url=v.url,
-            risk_level=v.risk_level,
-            risk_score=v.risk_score,
-        )
-        recalls.append(recall)
-    return recalls
+    return [_violation_to_recall(v) async for v in get_all_violations_iter()]
 
 
 async def get_recall(recall_id: str) -> Optional[Recall]:
@@ -989,56 +1239,13 @@ async def get_recall(recall_id: str) -> Optional[Recall]:
     if not violation:
         return None
     
-    from app.models.recall import Recall, RecallProduct, RecallImage, RecallHazard, RecallRemedy
-    return Recall(
-        recall_id=violation.violation_id,
-        recall_number=violation.violation_number,
-        title=violation.title,
-        description=violation.description or "",
-        recall_date=violation.violation_date,
-        units_sold=violation.units_affected,
-        injuries=violation.injuries,
-        deaths=violation.deaths,
-        incidents=violation.incidents,
-        products=[RecallProduct(**p.model_dump()) for p in violation.products],
-        images=[RecallImage(**i.model_dump()) for i in violation.images],
-        hazards=[RecallHazard(**h.model_dump()) for h in violation.hazards],
-        remedies=[RecallRemedy(**r.model_dump()) for r in violation.remedies],
-        source=violation.agency_name,
-        source_url=violation.url,
-        risk_level=violation.risk_level,
-        risk_score=violation.risk_score,
-    )
+    return _violation_to_recall(violation)
 
 
 async def search_recalls(query: str, risk_level: Optional[RiskLevel] = None) -> List[Recall]:
     """Search recalls (backward compatibility)."""
     violations = await search_violations(query, risk_level=risk_level)
-    # Convert to recalls
-    from app.models.recall import Recall, RecallProduct, RecallImage, RecallHazard, RecallRemedy
-    recalls = []
-    for v in violations:
-        recall = Recall(
-            recall_id=v.violation_id,
-            recall_number=v.violation_number,
-            title=v.title,
-            description=v.description or "",
-            recall_date=v.violation_date,
-            units_sold=v.units_affected,
-            injuries=v.injuries,
-            deaths=v.deaths,
-            incidents=v.incidents,
-            products=[RecallProduct(**p.model_dump()) for p in v.products],
-            images=[RecallImage(**i.model_dump()) for i in v.images],
-            hazards=[RecallHazard(**h.model_dump()) for h in v.hazards],
-            remedies=[RecallRemedy(**r.model_dump()) for r in v.remedies],
-            source=v.agency_name,
-            source_url=v.url,
-            risk_level=v.risk_level,
-            risk_score=v.risk_score,
-        )
-        recalls.append(recall)
-    return recalls
+    return [_violation_to_recall(v) for v in violations]
 
 
 async def add_recall(recall: Recall) -> Recall:
@@ -1067,56 +1274,13 @@ async def add_recall(recall: Recall) -> Recall:
     product_ban = await add_violation(product_ban)
     
     # Convert back to recall
-    from app.models.recall import Recall, RecallProduct, RecallImage, RecallHazard, RecallRemedy
-    return Recall(
-        recall_id=product_ban.product_ban_id,
-        recall_number=product_ban.ban_number,
-        title=product_ban.title,
-        description=product_ban.description or "",
-        recall_date=product_ban.ban_date,
-        units_sold=product_ban.units_affected,
-        injuries=product_ban.injuries,
-        deaths=product_ban.deaths,
-        incidents=product_ban.incidents,
-        products=[RecallProduct(**p.model_dump()) for p in product_ban.products],
-        images=[RecallImage(**i.model_dump()) for i in product_ban.images],
-        hazards=[RecallHazard(**h.model_dump()) for h in product_ban.hazards],
-        remedies=[RecallRemedy(**r.model_dump()) for r in product_ban.remedies],
-        source=product_ban.agency_name,
-        source_url=product_ban.url,
-        risk_level=product_ban.risk_level,
-        risk_score=product_ban.risk_score,
-    )
+    return _violation_to_recall(product_ban)
 
 
 async def get_recalls_by_risk(risk_level: RiskLevel) -> List[Recall]:
     """Get recalls filtered by risk level (backward compatibility)."""
     violations = await get_violations_by_risk(risk_level)
-    # Convert to recalls
-    from app.models.recall import Recall, RecallProduct, RecallImage, RecallHazard, RecallRemedy
-    recalls = []
-    for v in violations:
-        recall = Recall(
-            recall_id=v.product_ban_id,
-            recall_number=v.ban_number,
-            title=v.title,
-            description=v.description or "",
-            recall_date=v.ban_date,
-            units_sold=v.units_affected,
-            injuries=v.injuries,
-            deaths=v.deaths,
-            incidents=v.incidents,
-            products=[RecallProduct(**p.model_dump()) for p in v.products],
-            images=[RecallImage(**i.model_dump()) for i in v.images],
-            hazards=[RecallHazard(**h.model_dump()) for h in v.hazards],
-            remedies=[RecallRemedy(**r.model_dump()) for r in v.remedies],
-            source=v.agency_name,
-            source_url=v.url,
-            risk_level=v.risk_level,
-            risk_score=v.risk_score,
-        )
-        recalls.append(recall)
-    return recalls
+    return [_violation_to_recall(v) for v in violations]
 
 
 async def get_recalls_risk_summary() -> Dict[str, int]:
@@ -1125,30 +1289,41 @@ async def get_recalls_risk_summary() -> Dict[str, int]:
 
 
 # Load from JSON functions (for initial data migration)
+def _read_json_items(json_path: Path, limit: int) -> List[dict]:
+    """
+    Read the first limit records from a JSON array (or an object's "recalls" array).
+    
+    Streams with ijson so only the needed records are parsed.
+    """
+    with open(json_path, 'rb') as f:
+        # Peek at the first non-whitespace byte to pick the array prefix
+        head = f.read(64).lstrip()
+        f.seek(0)
+        prefix = 'item' if head.startswith(b'[') else 'recalls.item'
+        return list(islice(ijson.items(f, prefix, use_float=True), limit))
+
+
 async def load_violations_from_json():
     """Load violations from JSON file (for migration)."""
     json_path = Path(__file__).parent.parent.parent.parent / "recalls.json"
     
     if not json_path.exists():
-        print(f"recalls.json not found at {json_path}")
+        logger.warning(f"recalls.json not found at {json_path}")
         return
     
     try:
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-        
-        violations_data = data if isinstance(data, list) else data.get('recalls', [])
+        violations_data = await asyncio.to_thread(_read_json_items, json_path, 100)  # Limit to 100
         
-        for i, item in enumerate(violations_data[:100]):  # Limit to 100
-            violation = parse_cpsc_to_violation(item, index=i)
-            if violation:
-                violation = await classify_violation(violation)
-                await add_violation(violation)
+        violations = [
+            violation for i, item in enumerate(violations_data)
+            if (violation := parse_cpsc_to_violation(item, index=i))
+        ]
+        await add_violations_bulk(violations)
         
-        print(f"Loaded violations from JSON")
+        logger.info("Loaded violations from JSON")
         
     except Exception as e:
-        print(f"Error loading violations from JSON: {e}")
+        logger.error(f"Error loading violations from JSON: {e}")
 
 
 async def load_recalls_from_json():
@@ -1156,10 +1331,48 @@ async def load_recalls_from_json():
     await load_violations_from_json()
 
 
+def _validated(model, **fields):
+    """Build a model with Pydantic validation (CPSC_STRICT_PARSE)."""
+    return model(**fields)
+
+
+def _constructed(model, **fields):
+    """Build a model from already-coerced fields without validation."""
+    return model.model_construct(**fields)
+
+
+def _cpsc_str(data: dict, *keys: str, default: str = '') -> str:
+    """First non-null value among keys, as a string (default if none is set)."""
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            return value if isinstance(value, str) else str(value)
+    return default
+
+
+def _cpsc_date(date_str: str) -> Optional[datetime]:
+    """Parse a CPSC date (ISO 8601, else anything dateutil understands); None if unparseable."""
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except ValueError:
+        pass
+    try:
+        return date_parser.parse(date_str)
+    except (ValueError, OverflowError):
+        return None
+
+
 def parse_cpsc_to_violation(data: dict, index: int = 0) -> Optional[ProductBan]:
-    """Convert CPSC recall data to a ProductBan."""
+    """
+    Convert CPSC recall data to a ProductBan.
+    
+    Every field is coerced to its model type here (null strings become defaults, counts
+    go through cpsc_api.parse_cpsc_count), so the models are built without Pydantic
+    validation unless CPSC_STRICT_PARSE is enabled.
+    """
+    build = _validated if settings.CPSC_STRICT_PARSE else _constructed
     try:
-        recall_number = data.get('RecallNumber', data.get('recallNumber', f'RECALL-{index}'))
+        recall_number = _cpsc_str(data, 'RecallNumber', 'recallNumber', default=f'RECALL-{index}')
         product_ban_id = f"cpsc-{recall_number}"
         
         # Parse products
@@ -1168,12 +1381,14 @@ def parse_cpsc_to_violation(data: dict, index: int = 0) -> Optional[ProductBan]:
         if isinstance(products_data, list):
             for p in products_data:
                 if isinstance(p, dict):
-                    products.append(ProductBanProduct(
-                        name=p.get('Name', p.get('name', 'Unknown Product')),
-                        description=p.get('Description', p.get('description', '')),
-                        model_number=p.get('ModelNumber', p.get('model', '')),
-                        manufacturer=p.get('Manufacturer', p.get('manufacturer', '')),
-                        identifiers={"UPC": p.get('UPC', '')} if p.get('UPC') else {}
+                    upc = _cpsc_str(p, 'UPC')
+                    products.append(build(
+                        ProductBanProduct,
+                        name=_cpsc_str(p, 'Name', 'name', default='Unknown Product'),
+                        description=_cpsc_str(p, 'Description', 'description'),
+                        model_number=_cpsc_str(p, 'ModelNumber', 'model'),
+                        manufacturer=_cpsc_str(p, 'Manufacturer', 'manufacturer'),
+                        identifiers={"UPC": upc} if upc else {}
                     ))
         
         # Parse images
@@ -1182,11 +1397,11 @@ def parse_cpsc_to_violation(data: dict, index: int = 0) -> Optional[ProductBan]:
         if isinstance(images_data, list):
             for img in images_data:
                 if isinstance(img, dict):
-                    url = img.get('URL', img.get('url', ''))
+                    url = _cpsc_str(img, 'URL', 'url')
                     if url:
-                        images.append(ProductBanImage(url=url))
+                        images.append(build(ProductBanImage, url=url))
                 elif isinstance(img, str):
-                    images.append(ProductBanImage(url=img))
+                    images.append(build(ProductBanImage, url=img))
         
         # Parse hazards
         hazards = []
@@ -1194,12 +1409,13 @@ def parse_cpsc_to_violation(data: dict, index: int = 0) -> Optional[ProductBan]:
         if isinstance(hazard_data, list):
             for h in hazard_data:
                 if isinstance(h, dict):
-                    hazards.append(ProductBanHazard(
-                        description=h.get('Name', h.get('description', '')),
-                        hazard_type=h.get('HazardType', '')
+                    hazards.append(build(
+                        ProductBanHazard,
+                        description=_cpsc_str(h, 'Name', 'description'),
+                        hazard_type=_cpsc_str(h, 'HazardType')
                     ))
                 elif isinstance(h, str):
-                    hazards.append(ProductBanHazard(description=h))
+                    hazards.append(build(ProductBanHazard, description=h))
         
         # Parse remedies
         remedies = []
@@ -1207,58 +1423,44 @@ def parse_cpsc_to_violation(data: dict, index: int = 0) -> Optional[ProductBan]:
         if isinstance(remedy_data, list):
             for r in remedy_data:
                 if isinstance(r, dict):
-                    remedies.append(ProductBanRemedy(
-                        description=r.get('Name', r.get('description', '')),
-                        remedy_type=r.get('RemedyType', '')
+                    remedies.append(build(
+                        ProductBanRemedy,
+                        description=_cpsc_str(r, 'Name', 'description'),
+                        remedy_type=_cpsc_str(r, 'RemedyType')
                     ))
         
         # Parse date
-        date_str = data.get('RecallDate', data.get('recallDate', ''))
-        ban_date = datetime.now()
-        if date_str:
-            try:
-                ban_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            except:
-                try:
-                    from dateutil import parser
-                    ban_date = parser.parse(date_str)
-                except:
-                    pass
-        
-        # Parse numbers
-        def safe_int(val, default=0):
-            if val is None:
-                return default
-            try:
-                return int(str(val).replace(',', ''))
-            except:
-                return default
+        date_str = _cpsc_str(data, 'RecallDate', 'recallDate')
+        ban_date = (_cpsc_date(date_str) if date_str else None) or datetime.now()
         
         # Get title
-        title = data.get('Title', data.get('title', ''))
+        title = _cpsc_str(data, 'Title', 'title')
         if not title and products:
             title = f"Recall: {products[0].name}"
         if not title:
             title = f"Recall {recall_number}"
         
-        url = data.get('URL', data.get('url', ''))
+        url = _cpsc_str(data, 'URL', 'url')
         if not url:
             url = f"https://www.cpsc.gov/Recalls/{recall_number}"
         
-        return ProductBan(
+        return build(
+            ProductBan,
             product_ban_id=product_ban_id,
             ban_number=recall_number,
             title=title,
-            description=data.get('Description', data.get('description', '')),
+            description=_cpsc_str(data, 'Description', 'description'),
             ban_date=ban_date,
-            units_affected=safe_int(data.get('NumberOfUnits', data.get('unitsAffected'))),
-            injuries=safe_int(data.get('Injuries', data.get('injuries'))),
-            deaths=safe_int(data.get('Deaths', data.get('deaths'))),
-            incidents=safe_int(data.get('Incidents', data.get('incidents'))),
+            units_affected=cpsc_api.parse_cpsc_count(data.get('NumberOfUnits', data.get('unitsAffected'))),
+            injuries=cpsc_api.parse_cpsc_count(data.get('Injuries', data.get('injuries'))),
+            deaths=cpsc_api.parse_cpsc_count(data.get('Deaths', data.get('deaths'))),
+            incidents=cpsc_api.parse_cpsc_count(data.get('Incidents', data.get('incidents'))),
             products=products,
             images=images,
             hazards=hazards,
             remedies=remedies,
+            organization_name="Consumer Product Safety Commission",
+            organization_type="regulatory_agency",
             agency_name="Consumer Product Safety Commission",
             agency_acronym="CPSC",
             url=url,
@@ -1266,7 +1468,7 @@ def parse_cpsc_to_violation(data: dict, index: int = 0) -> Optional[ProductBan]:
         )
         
     except Exception as e:
-        print(f"Error parsing violation: {e}")
+        logger.warning(f"Error parsing violation: {e}")
         return None
 
 
@@ -1274,11 +1476,11 @@ def parse_cpsc_to_violation(data: dict, index: int = 0) -> Optional[ProductBan]:
 async def ensure_default_organization(session: AsyncSession):
     """Ensure a default organization exists for local development."""
     try:
-        # Check if any organization exists
-        result = await session.execute(select(OrganizationDB).limit(1))
-        existing = result.scalar_one_or_none()
+        # Check if any organization exists (ID only; no need to load the whole row)
+        result = await session.execute(select(OrganizationDB.organization_id).limit(1))
+        existing_id = result.scalar()
         
-        if not existing:
+        if existing_id is None:
             # Create a default development organization
             org_id = f"{OrganizationType.REGULATORY_AGENCY.value}-dev-{uuid.uuid4().hex[:8]}"
             default_org = Organization(
@@ -1300,11 +1502,11 @@ async def ensure_default_organization(session: AsyncSession):
             db_org = organization_to_db(default_org)
             session.add(db_org)
             await session.commit()
-            print(f"Default development organization created: {org_id}")
+            logger.info(f"Default development organization created: {org_id}")
         else:
-            print(f"Organization already exists: {existing.organization_id}")
+            logger.info(f"Organization already exists: {existing_id}")
     except Exception as e:
-        print(f"Error ensuring default organization: {e}")
+        logger.error(f"Error ensuring default organization: {e}")
         # Don't raise - this is optional initialization
 
 
@@ -1317,7 +1519,7 @@ async def get_organizations(
 ) -> List[Organization]:
     """Get all organizations with optional filtering."""
     async with AsyncSessionLocal() as session:
-        query = select(OrganizationDB)
+        query = select(*_ORGANIZATION_COLUMNS)
         
         if organization_type:
             query = query.where(OrganizationDB.organization_type == organization_type)
@@ -1332,15 +1534,14 @@ async def get_organizations(
             query = query.limit(limit).offset(offset)
         
         result = await session.execute(query)
-        db_orgs = result.scalars().all()
-        return [db_to_organization(db_org) for db_org in db_orgs]
+        return [db_to_organization(row) for row in result.all()]
 
 
-async def get_organization(organization_id: str) -> Optional[Organization]:
+async def get_organization(organization_id: str, session: Optional[AsyncSession] = None) -> Optional[Organization]:
     """Get a specific organization by ID."""
-    async with AsyncSessionLocal() as session:
+    async with _use_session(session) as session:
         result = await session.execute(
-            select(OrganizationDB).where(OrganizationDB.organization_id == organization_id)
+            _ORGANIZATION_SELECT, {"organization_id": organization_id}
         )
         db_org = result.scalar_one_or_none()
         if not db_org:
@@ -1353,6 +1554,7 @@ async def create_organization(organization: OrganizationCreate) -> Organization:
     async with AsyncSessionLocal() as session:
         # Generate organization_id
         org_id = f"{organization.organization_type.value}-{uuid.uuid4().hex[:12]}"
+        now = datetime.utcnow()
         
         # Create Organization from OrganizationCreate
         org = Organization(
@@ -1383,6 +1585,9 @@ async def create_organization(organization: OrganizationCreate) -> Organization:
             api_key=organization.api_key,
             api_headers=organization.api_headers or {},
             api_enabled='api' in (organization.import_methods or []),
+            api_max_concurrency=organization.api_max_concurrency,
+            api_rate_per_min=organization.api_rate_per_min,
+            api_http2_enabled=organization.api_http2_enabled,
             file_upload_method=organization.file_upload_method,
             blob_storage_provider=organization.blob_storage_provider,
             blob_storage_container=organization.blob_storage_container,
@@ -1398,15 +1603,14 @@ async def create_organization(organization: OrganizationCreate) -> Organization:
             last_violation_date=None,
             voluntary_recalls_count=0,
             joint_recalls_count=0,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+            created_at=now,
+            updated_at=now,
             verified_at=None,
         )
         
         db_org = organization_to_db(org)
         session.add(db_org)
         await session.commit()
-        await session.refresh(db_org)
         
         return db_to_organization(db_org)
 
@@ -1415,7 +1619,7 @@ async def update_organization(organization_id: str, updates: OrganizationUpdate)
     """Update an organization."""
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(OrganizationDB).where(OrganizationDB.organization_id == organization_id)
+            _ORGANIZATION_SELECT, {"organization_id": organization_id}
         )
         db_org = result.scalar_one_or_none()
         if not db_org:
@@ -1430,7 +1634,6 @@ async def update_organization(organization_id: str, updates: OrganizationUpdate)
         db_org.updated_at = datetime.utcnow()
         
         await session.commit()
-        await session.refresh(db_org)
         
         return db_to_organization(db_org)
 
@@ -1439,7 +1642,7 @@ async def delete_organization(organization_id: str) -> bool:
     """Soft delete an organization (set status to inactive)."""
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(OrganizationDB).where(OrganizationDB.organization_id == organization_id)
+            _ORGANIZATION_SELECT, {"organization_id": organization_id}
         )
         db_org = result.scalar_one_or_none()
         if not db_org:
@@ -1452,22 +1655,18 @@ async def delete_organization(organization_id: str) -> bool:
         return True
 
 
-async def get_current_user_organization() -> Optional[Organization]:
+async def get_current_user_organization(session: Optional[AsyncSession] = None) -> Optional[Organization]:
     """Get the current user's organization (placeholder - needs auth integration)."""
     # TODO: Get from auth context/session
     # For now, return the first/most recent organization (single-tenant mode)
     try:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                select(OrganizationDB).order_by(OrganizationDB.created_at.desc()).limit(1)
-            )
+        async with _use_session(session) as session:
+            result = await session.execute(_NEWEST_ORGANIZATION_SELECT)
             db_org = result.scalar_one_or_none()
             if db_org:
                 return db_to_organization(db_org)
             return None
     except Exception as e:
-        import traceback
-        print(f"[ERROR] get_current_user_organization failed: {e}")
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        logger.exception(f"get_current_user_organization failed: {e}")
         raise
 
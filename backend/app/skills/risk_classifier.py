@@ -16,6 +16,8 @@ from app.services import database as db
 from typing import Tuple, Optional
 import re
 
+import orjson
+
 
 async def get_risk_classification_config() -> RiskClassificationConfig:
     """Get risk classification configuration from skill settings."""
@@ -42,6 +44,12 @@ async def get_risk_classification_config() -> RiskClassificationConfig:
         return get_default_risk_classification_config()
 
 
+async def get_risk_classification_fingerprint() -> bytes:
+    """Stable serialization of the active risk rules; changes whenever they are edited."""
+    config = await get_risk_classification_config()
+    return orjson.dumps(config.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+
+
 def get_field_value(product_ban: ProductBan, field_path: str) -> any:
     """Get a field value from a product ban using dot notation or direct attribute access."""
     # Handle direct attributes first
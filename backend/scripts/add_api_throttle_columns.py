@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Add API throttling columns to organizations table
+===================================================================
+Adds the per-organization API throttling columns to the organizations
+table if they don't already exist.
+
+Usage:
+    python backend/scripts/add_api_throttle_columns.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import text
+from app.db.session import engine
+from app.config import settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (column name, SQL type) pairs to add to the organizations table
+COLUMNS = [
+    ("api_max_concurrency", "INTEGER"),
+    ("api_rate_per_min", "INTEGER"),
+    ("api_http2_enabled", "BOOLEAN DEFAULT FALSE"),
+]
+
+
+async def column_exists(conn, table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    if "sqlite" in settings.get_database_url():
+        # SQLite
+        result = await conn.execute(
+            text(f"PRAGMA table_info({table_name})")
+        )
+        columns = result.fetchall()
+        return any(col[1] == column_name for col in columns)
+    else:
+        # PostgreSQL
+        result = await conn.execute(
+            text("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.columns 
+                    WHERE table_schema = 'public' 
+                    AND table_name = :table_name
+                    AND column_name = :column_name
+                )
+            """),
+            {"table_name": table_name, "column_name": column_name}
+        )
+        return result.scalar()
+
+
+async def migrate():
+    """Add API throttling columns if they don't exist."""
+    async with engine.begin() as conn:
+        for column_name, column_type in COLUMNS:
+            if await column_exists(conn, "organizations", column_name):
+                logger.info(f"✓ Column '{column_name}' already exists. Skipping.")
+                continue
+            
+            logger.info(f"Adding '{column_name}' column to organizations table...")
+            await conn.execute(
+                text(f"ALTER TABLE organizations ADD COLUMN {column_name} {column_type}")
+            )
+            logger.info(f"✓ Successfully added '{column_name}' column to organizations table")
+
+
+async def main():
+    """Main migration function."""
+    logger.info("=" * 60)
+    logger.info("Migration: Add API throttling columns")
+    logger.info("=" * 60)
+    logger.info("")
+    
+    try:
+        await migrate()
+        logger.info("")
+        logger.info("=" * 60)
+        logger.info("Migration completed successfully!")
+        logger.info("=" * 60)
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        raise
+
+
+if __name__ == "__main__":
+    asyncio.run(main())